@@ -79,7 +79,8 @@ class Circle(NamedTuple):
     def outterbox(self):
         return Rectangle(self.center.shift(-self.radius), self.center.shift(self.radius))
 
-    def move(self, direction=Direction.rand(), distance=None):
+    def move(self, direction=None, distance=None):
+        direction = direction if direction else Direction.rand()
         distance = distance if distance else 2 * self.radius
         return Circle(direction.point().scale(distance) + self.center, self.radius)
 
@@ -0,0 +1,72 @@
+from collections import Counter
+from functools import lru_cache
+from life.canonical import canonical
+from life.components import components
+from life.life import centralize, cycle, energyprofile, isstill
+from life.stats import STATS
+
+CACHESIZE = 2**16
+
+
+def canonical_rule(rule):
+    return frozenset(rule[0]), frozenset(rule[1])
+
+
+def centralshape(part):
+    return frozenset(centralize(part))
+
+
+@lru_cache(maxsize=CACHESIZE)
+def shape_isstill(shape, rule, limit):
+    STATS.count('shape cache misses')
+    return isstill(shape, rule, limit)
+
+
+@lru_cache(maxsize=CACHESIZE)
+def shape_cycle(shape, rule, limit):
+    STATS.count('shape cache misses')
+    return cycle(shape, rule, limit)
+
+
+@lru_cache(maxsize=CACHESIZE)
+def shape_count(shape, distance):
+    STATS.count('shape cache misses')
+    return len(components(shape, distance))
+
+
+class Analysis:
+    def __init__(self, configuration, rule):
+        self.configuration = configuration
+        self.rule = canonical_rule(rule)
+        self.parts = dict()
+        self.shapes = dict()
+        self.profiles = dict()
+
+    def components(self, distance):
+        if distance not in self.parts:
+            self.parts[distance] = components(self.configuration, distance)
+            STATS.count('components', len(self.parts[distance]))
+        return self.parts[distance]
+
+    def split(self, distance, symmetric=False):
+        if (distance, symmetric) not in self.shapes:
+            self.shapes[distance, symmetric] = Counter(map(canonical if symmetric else centralshape,
+                                                           self.components(distance)))
+        return self.shapes[distance, symmetric]
+
+    def profile(self, distance):
+        if distance not in self.profiles:
+            self.profiles[distance] = Counter(map(energyprofile, self.components(distance)))
+        return self.profiles[distance]
+
+    def isstill(self, shape, limit):
+        STATS.count('shape cache calls')
+        return shape_isstill(canonical(shape), self.rule, limit)
+
+    def cycle(self, shape, limit):
+        STATS.count('shape cache calls')
+        return shape_cycle(canonical(shape), self.rule, limit)
+
+    def count(self, shape, distance):
+        STATS.count('shape cache calls')
+        return shape_count(canonical(shape), distance)
@@ -0,0 +1,120 @@
+from argparse import ArgumentParser
+from common.config import readjson
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from csv import writer
+from itertools import product
+from json import loads
+from life import simulation
+from life.population import Population
+from life.rleparser import to_rle
+from os import cpu_count, makedirs
+from os.path import dirname, isabs, join
+from random import seed as randseed
+from time import perf_counter
+
+
+CONFIG = readjson(__file__)
+COLUMNS = ['run', 'seed', 'iterations', 'seconds', 'population', 'average', 'best', 'cells', 'best rule', 'rle']
+
+
+def __value__(text):
+    try:
+        return loads(text)
+    except ValueError:
+        return text
+
+
+def __assignment__(text):
+    key, _, value = text.partition('=')
+    return key.strip(), __value__(value.strip())
+
+
+def __rule__(rule):
+    return "B" + ''.join(str(b) for b in sorted(rule[0])) + "/S" + ''.join(str(s) for s in sorted(rule[1]))
+
+
+def runs(config):
+    keys = sorted(config['sweep'])
+    for values in product(*(config['sweep'][key] for key in keys)):
+        for runseed in range(config['seeds']):
+            yield {**config['overrides'], **dict(zip(keys, values))}, runseed
+
+
+def evolve(index, overrides, runseed, iterations):
+    simulation.configure(overrides)
+    simulation.SAVINGS.clear()
+    randseed(runseed)
+    pop, st = Population(), perf_counter()
+    for _ in range(iterations):
+        pop = simulation.simulate(pop)
+    if simulation.CACHE:
+        simulation.CACHE.close()
+    maxfit, (bestconf, bestrule) = simulation.bestfit(pop)
+    return {'run': index, 'seed': runseed, 'iterations': iterations,
+            'seconds': round(perf_counter() - st, 2), 'population': len(pop),
+            'average': round(simulation.avgfitness(pop), 4), 'best': round(maxfit, 4),
+            'cells': len(bestconf), 'best rule': __rule__(bestrule) if bestconf else '',
+            'rle': to_rle(bestconf).replace('\n', '') if bestconf else '', **overrides}
+
+
+def __table__(output, swept, rows):
+    with open(output, 'w', newline='') as file:
+        table = writer(file)
+        table.writerow(COLUMNS[:3] + swept + COLUMNS[3:])
+        for row in sorted(rows, key=lambda row: row['run']):
+            table.writerow([row[c] for c in COLUMNS[:3]] + [row[k] for k in swept] + [row[c] for c in COLUMNS[3:]])
+
+
+def run(config, output):
+    tasks = [*runs(config)]
+    swept = sorted(config['sweep'])
+    workers = config['workers'] if config['workers'] >= 0 else max(0, cpu_count() + config['workers'])
+    makedirs(dirname(output) or '.', exist_ok=True)
+    rows = []
+    pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+    try:
+        results = (future.result() for future in as_completed([pool.submit(evolve, i, *task, config['iterations'])
+                                                                for i, task in enumerate(tasks)])) if pool \
+            else (evolve(i, *task, config['iterations']) for i, task in enumerate(tasks))
+        for row in results:
+            rows.append(row)
+            __table__(output, swept, rows)
+            if __name__ == '__main__':
+                print("run {:3d}/{:d}".format(len(rows), len(tasks)), ":\tseed:", row['seed'],
+                      *("\t{}: {}".format(k, row[k]) for k in swept),
+                      "\tbest:", "{:.02f}".format(row['best']), "\tavg:", "{:.02f}".format(row['average']),
+                      "\tt:", "{:.02f}".format(row['seconds']))
+    finally:
+        if pool:
+            pool.shutdown()
+    return sorted(rows, key=lambda row: row['run'])
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Run the life GA headless over many seeds and parameter sweeps")
+    parser.add_argument('configs', nargs='*', help="JSON files whose keys override batch.json")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help="override a simulation.json setting for every run")
+    parser.add_argument('--sweep', action='append', default=[], metavar='KEY=V1,V2',
+                        help="run every combination of these simulation.json settings")
+    parser.add_argument('--seeds', type=int, help="runs per combination, seeded 0..n-1")
+    parser.add_argument('--iterations', type=int, help="GA iterations per run")
+    parser.add_argument('--workers', type=int, help="concurrent runs, 0 runs in-process, negative counts back from the cores")
+    parser.add_argument('--out', help="results CSV, relative paths go under life/log")
+    args = parser.parse_args()
+    config = {**CONFIG, 'overrides': dict(CONFIG['overrides']), 'sweep': dict(CONFIG['sweep'])}
+    for path in args.configs:
+        with open(path, 'r') as file:
+            extra = loads(file.read())
+        config['overrides'].update(extra.pop('overrides', dict()))
+        config['sweep'].update(extra.pop('sweep', dict()))
+        config.update(extra)
+    config['overrides'].update(__assignment__(text) for text in args.set)
+    for text in args.sweep:
+        key, _, values = text.partition('=')
+        config['sweep'][key.strip()] = [__value__(value.strip()) for value in values.split(',')]
+    for key in ('seeds', 'iterations', 'workers'):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    output = args.out if args.out else config['results']
+    run(config, output if isabs(output) else join(dirname(__file__), "log", output))
@@ -0,0 +1,157 @@
+from argparse import ArgumentParser
+from inspect import isfunction
+from json import dumps, loads
+from random import randint, seed
+from os.path import dirname, exists, join
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from common.config import readjson
+from common.geometry import Point
+from life import analysis, hashlife, metrics, simulation
+from life.analysis import Analysis
+from life.hashlife import advance_n
+from life.life import LIFE, Stepper, advance, split
+from life.population import Population
+from life.rleparser import from_rle, to_rle
+
+CONFIG = readjson(__file__)
+PATTERNS = {
+    'r-pentomino': "b2o$2o$bo!",
+    'acorn': "bo$3bo$2o2b3o!",
+    'gosper gun': "24bo$22bobo$12b2o6b2o12b2o$11bo3bo4b2o12b2o$2o8bo5bo3b2o$2o8bo3bob2o4bobo$"
+                  "10bo5bo7bo$11bo3bo$12b2o!",
+}
+METRICS = [name for name, value in sorted(vars(metrics).items())
+           if isfunction(value) and value.__module__ == metrics.__name__ and name[0] != '_' and name != 'measure']
+MEMOS = [hashlife.successor, hashlife.join, hashlife.empty,
+         analysis.shape_isstill, analysis.shape_cycle, analysis.shape_count]
+
+
+def soup(cells, density=0.5):
+    side = int((cells / density) ** 0.5)
+    configuration = set()
+    while len(configuration) < cells:
+        configuration.add(Point(randint(0, side), randint(0, side)))
+    return configuration
+
+
+def cold():
+    for memo in MEMOS:
+        memo.cache_clear()
+
+
+def timed(func, *args):
+    cold()
+    st = perf_counter()
+    result = func(*args)
+    return perf_counter() - st, result
+
+
+def patterns():
+    result = {name: from_rle(rle)[0] for name, rle in PATTERNS.items()}
+    for density in CONFIG['densities']:
+        seed(int(density * 100))
+        result['soup {:.2f}'.format(density)] = soup(CONFIG['soup size'], density)
+    return result
+
+
+def __generations__(engine, configuration, generations):
+    stepper = Stepper(configuration, LIFE, simulation.ENGINES[engine])
+    for _ in range(generations):
+        stepper.step()
+    return generations
+
+
+def __settled__(configuration, generations):
+    for _ in range(generations):
+        configuration = advance(configuration, LIFE)
+    return configuration
+
+
+def __split__(configuration):
+    split(configuration, 2)
+    return 1
+
+
+def __metric__(metric, configuration):
+    metrics.measure(metric, {'origin': configuration, 'configuration': configuration, 'rule': LIFE,
+                             'analysis': Analysis(configuration, LIFE),
+                             'moving weight': 10, 'iterations': 1, 'cyclesize': 2})
+    return 1
+
+
+def __ga__(generations):
+    seed(0)
+    simulation.resetcache(store=False)
+    population = Population()
+    for _ in range(generations):
+        population = simulation.simulate(population)
+    return generations * simulation.CONFIG['replacements']
+
+
+def __rle__(configuration):
+    return len(from_rle(to_rle(configuration, LIFE))[0])
+
+
+def cases():
+    confs = patterns()
+    for engine in CONFIG['engines']:
+        for name, configuration in confs.items():
+            yield 'advance/{}/{}'.format(engine, name), \
+                lambda e=engine, c=configuration: __generations__(e, c, CONFIG['generations'])
+    for name, configuration in confs.items():
+        yield 'advance_n/hashlife/{}'.format(name), \
+            lambda c=configuration: len(advance_n(c, LIFE, CONFIG['generations'])) and CONFIG['generations']
+    for name, configuration in confs.items():
+        yield 'split/{}'.format(name), lambda c=configuration: __split__(c)
+    settled = __settled__(confs['soup {:.2f}'.format(CONFIG['densities'][-1])], CONFIG['generations'])
+    for metric in METRICS:
+        yield 'metric/{}'.format(metric), lambda m=metric: __metric__(m, settled)
+    yield 'ga/generation', lambda: __ga__(CONFIG['ga generations'])
+    for size in CONFIG['rle sizes']:
+        seed(size)
+        configuration = soup(size)
+        yield 'rle/{}'.format(size), lambda c=configuration: __rle__(c)
+
+
+def measure(func, repeat):
+    t, ops = min(timed(func) for _ in range(repeat))
+    cold()
+    start()
+    func()
+    peak = get_traced_memory()[1]
+    stop()
+    return {'ops/s': ops / t, 'peak': peak}
+
+
+def run(selected=None, baseline=None, save=None):
+    state = simulation.CONFIG['replacements'], simulation.CONFIG['random inserts']
+    simulation.CONFIG['replacements'] = simulation.CONFIG['random inserts'] = CONFIG['ga replacements']
+    reference = dict()
+    if baseline and exists(baseline):
+        with open(baseline, 'r') as file:
+            reference = loads(file.read())
+    results = dict()
+    for name, func in cases():
+        if selected and not any(name.startswith(s) for s in selected):
+            continue
+        results[name] = measure(func, CONFIG['repeat'])
+        ratio = results[name]['ops/s'] / reference[name]['ops/s'] if name in reference else None
+        print("{:40s}".format(name), ":\tops/s:", "{:12.2f}".format(results[name]['ops/s']),
+              "\tpeak:", "{:8.0f} KiB".format(results[name]['peak'] / 1024),
+              "\tvs base:", "{:.2f}x".format(ratio) if ratio else "-")
+    simulation.CONFIG['replacements'], simulation.CONFIG['random inserts'] = state
+    if save:
+        with open(save, 'w') as file:
+            file.write(dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Headless benchmarks for the life engine, GA loop and RLE codec")
+    parser.add_argument('selected', nargs='*', help="only run cases whose name starts with these prefixes")
+    parser.add_argument('--baseline', default=join(dirname(__file__), CONFIG['baseline']),
+                        help="JSON results to compare against")
+    parser.add_argument('--save', help="write the results as JSON to this file")
+    args = parser.parse_args()
+    run(args.selected, args.baseline, args.save)
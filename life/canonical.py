@@ -0,0 +1,33 @@
+from array import array
+from hashlib import blake2b
+from common.geometry import Point
+
+SYMMETRIES = [lambda x, y: (x, y), lambda x, y: (-x, y), lambda x, y: (x, -y), lambda x, y: (-x, -y),
+              lambda x, y: (y, x), lambda x, y: (-y, x), lambda x, y: (y, -x), lambda x, y: (-y, -x)]
+
+
+def __packed__(cells, width):
+    minx, miny = min(x for x, _ in cells), min(y for _, y in cells)
+    return array('q', [width] + sorted((y - miny) * width + x - minx for x, y in cells)).tobytes()
+
+
+def packed(configuration, symmetric=True):
+    if len(configuration) == 0:
+        return b''
+    xs, ys = [cell.x for cell in configuration], [cell.y for cell in configuration]
+    width = max(max(xs) - min(xs), max(ys) - min(ys)) + 1
+    return min(__packed__([symmetry(x, y) for x, y in zip(xs, ys)], width)
+               for symmetry in (SYMMETRIES if symmetric else SYMMETRIES[:1]))
+
+
+def unpacked(key):
+    width, *cells = array('q', key) if key else (1,)
+    return frozenset(Point(cell % width, cell // width) for cell in cells)
+
+
+def fingerprint(configuration, symmetric=True):
+    return int.from_bytes(blake2b(packed(configuration, symmetric), digest_size=16).digest(), 'little')
+
+
+def canonical(configuration):
+    return unpacked(packed(configuration))
@@ -0,0 +1,120 @@
+from common.geometry import Point
+from functools import lru_cache
+from gc import disable, enable, isenabled
+from itertools import accumulate
+from os import makedirs, replace
+from os.path import dirname
+from re import compile
+from struct import Struct
+from zlib import compress, decompress
+from life.population import Population
+
+MAGIC = b'LIFECKPT'
+VERSION = 1
+__header__ = Struct('<BQdd625IB')
+__gauss__ = Struct('<d')
+__sizes__ = Struct('<QI')
+__individual__ = Struct('<dHH16sI')
+__multibyte__ = compile(rb'[\x80-\xff]+[\x00-\x7f]')
+
+
+def __varint__(out, value):
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def __varints__(data):
+    values, start = [], 0
+    for match in __multibyte__.finditer(data):
+        values.extend(data[start:match.start()])
+        values.append(sum((byte & 0x7f) << (7 * i) for i, byte in enumerate(match[0])))
+        start = match.end()
+    values.extend(data[start:])
+    return values
+
+
+def __zigzag__(value): return value << 1 if value >= 0 else (-value << 1) - 1
+def __unzigzag__(value): return -((value + 1) >> 1) if value & 1 else value >> 1
+
+
+def __mask__(digits): return sum(1 << d for d in digits)
+@lru_cache(maxsize=None)
+def __digits__(mask): return frozenset(d for d in range(16) if mask >> d & 1)
+
+
+def __deltas__(out, configuration, previous):
+    px, py = previous
+    for y, x in sorted((cell.y, cell.x) for cell in configuration):
+        __varint__(out, __zigzag__(y - py))
+        __varint__(out, __zigzag__(x - px))
+        px, py = x, y
+    return px, py
+
+
+def encode(iteration, individuals, state, best, elapsed):
+    (currmax, currbest), (rngversion, internal, gauss) = best, state
+    out = bytearray(__header__.pack(VERSION, iteration, currmax, elapsed, *internal, rngversion))
+    out += b'\x00' if gauss is None else b'\x01' + __gauss__.pack(gauss)
+    out += __sizes__.pack(len(individuals), len(currbest))
+    for fitness, configuration, rule, (fp, _, _) in individuals:
+        out += __individual__.pack(fitness, __mask__(rule[0]), __mask__(rule[1]),
+                                   fp.to_bytes(16, 'little'), len(configuration))
+    previous = __deltas__(out, currbest, (0, 0))
+    for _, configuration, _, _ in individuals:
+        previous = __deltas__(out, configuration, previous)
+    return MAGIC + compress(out, 1)
+
+
+def decode(blob):
+    if blob[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a life checkpoint")
+    data = decompress(blob[len(MAGIC):])
+    if data[0] != VERSION:
+        raise ValueError("unsupported checkpoint version {}".format(data[0]))
+    _, iteration, currmax, elapsed, *internal, rngversion = __header__.unpack_from(data)
+    i = __header__.size + 1
+    gauss = __gauss__.unpack_from(data, i)[0] if data[i - 1] else None
+    i += __gauss__.size if data[i - 1] else 0
+    n, bestsize = __sizes__.unpack_from(data, i)
+    i += __sizes__.size
+    records = [*__individual__.iter_unpack(data[i:i + n * __individual__.size])]
+    values = __varints__(data[i + n * __individual__.size:])
+    cells = [*map(Point._make, zip(accumulate(map(__unzigzag__, values[1::2])),
+                                   accumulate(map(__unzigzag__, values[0::2]))))]
+    individuals, start = [], bestsize
+    for fitness, born, surv, fp, size in records:
+        rule = __digits__(born), __digits__(surv)
+        individuals.append((fitness, set(cells[start:start + size]), rule,
+                            (int.from_bytes(fp, 'little'), *rule)))
+        start += size
+    return iteration, individuals, (rngversion, tuple(internal), gauss), \
+        (currmax, set(cells[:bestsize])), elapsed
+
+
+def snapshot(population):
+    return [(fitness, configuration, rule, k)
+            for (fitness, (configuration, rule)), k in zip(population, population.keys)]
+
+
+def save(filepath, iteration, individuals, state, best, elapsed):
+    makedirs(dirname(filepath), exist_ok=True)
+    with open(filepath + ".tmp", "wb") as file:
+        file.write(encode(iteration, individuals, state, best, elapsed))
+    replace(filepath + ".tmp", filepath)
+
+
+def load(filepath):
+    collecting = isenabled()
+    disable()
+    try:
+        with open(filepath, "rb") as file:
+            iteration, individuals, state, best, elapsed = decode(file.read())
+        population = Population()
+        for individual in individuals:
+            population.add(*individual)
+    finally:
+        if collecting:
+            enable()
+    return iteration, population, state, best, elapsed
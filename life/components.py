@@ -0,0 +1,44 @@
+from life.packed import SHIFT, packall, unpackall
+
+
+def __offsets__(mindistance, maxdistance):
+    return [(dy << SHIFT) + dx for dy in range(0, maxdistance + 1)
+            for dx in range(-maxdistance, maxdistance + 1)
+            if (dy > 0 or dx > 0) and mindistance < max(abs(dx), dy)]
+
+
+def __find__(parent, cell):
+    while parent[cell] != cell:
+        parent[cell] = parent[parent[cell]]
+        cell = parent[cell]
+    return cell
+
+
+def __union__(parent, offsets):
+    for cell in parent:
+        for offset in offsets:
+            other = cell + offset
+            if other in parent:
+                root, otherroot = __find__(parent, cell), __find__(parent, other)
+                if root != otherroot:
+                    parent[otherroot] = root
+
+
+def __groups__(parent):
+    groups = dict()
+    for cell in parent:
+        groups.setdefault(__find__(parent, cell), []).append(cell)
+    return [unpackall(group) for group in groups.values()]
+
+
+def labeling(configuration, distances):
+    parent = {cell: cell for cell in packall(configuration)}
+    result, previous = dict(), 0
+    for distance in sorted(set(distances)):
+        __union__(parent, __offsets__(previous, distance))
+        result[distance], previous = __groups__(parent), distance
+    return result
+
+
+def components(configuration, distance):
+    return labeling(configuration, (distance,))[distance]
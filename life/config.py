@@ -1,14 +1,89 @@
+from atexit import register
 from life.rleparser import to_rle
-from os import makedirs
-from os.path import exists, join, dirname
-
-
-def log(filepath, filename, configuration, rule, conffitness, iterations):
-    logdir = join(dirname(filepath), "log")
-    if not exists(logdir):
-        makedirs(logdir)
-    with open(join(logdir, filename), "a") as logfile:
-        logfile.write("\n".join([" | ".join(["{:02.2f}".format(conffitness),
-                                            str(len(configuration)),
-                                            str(iterations) if iterations else ""]),
-                                 to_rle(configuration, rule), "\n"]))
+from life.stats import STATS
+from os import getpid, makedirs
+from os.path import join, dirname
+from queue import Empty, Full, Queue
+from threading import Thread
+from time import perf_counter
+
+
+def __entry__(configuration, rule, conffitness, iterations):
+    return "\n".join([" | ".join(["{:02.2f}".format(conffitness),
+                                  str(len(configuration)),
+                                  str(iterations) if iterations else ""]),
+                      to_rle(configuration, rule), "\n"])
+
+
+class Logger:
+    def __init__(self, filepath, size=1024, interval=1.0, batch=256):
+        self.logdir = join(dirname(filepath), "log")
+        self.queue = Queue(maxsize=size)
+        self.interval, self.batch = interval, batch
+        self.files = dict()
+        self.worker, self.pid = None, None
+        self.written, self.blocked, self.waited, self.highwater = 0, 0, 0.0, 0
+        register(self.close)
+
+    def __open__(self, filename):
+        if filename not in self.files:
+            makedirs(self.logdir, exist_ok=True)
+            self.files[filename] = open(join(self.logdir, filename), "a")
+        return self.files[filename]
+
+    def __flush__(self):
+        for logfile in self.files.values():
+            logfile.flush()
+
+    def __run__(self):
+        flushed = perf_counter()
+        while True:
+            try:
+                items = [self.queue.get(timeout=self.interval)]
+            except Empty:
+                items = []
+            while items and items[-1] is not None and len(items) < self.batch:
+                try:
+                    items.append(self.queue.get_nowait())
+                except Empty:
+                    break
+            for item in items:
+                if item is None:
+                    self.__flush__()
+                    for logfile in self.files.values():
+                        logfile.close()
+                    self.files.clear()
+                    return
+                filename, *entry = item
+                self.__open__(filename).write(__entry__(*entry))
+                self.written += 1
+            if perf_counter() - flushed >= self.interval:
+                self.__flush__()
+                flushed = perf_counter()
+
+    def write(self, filename, configuration, rule, conffitness, iterations=None):
+        if self.pid != getpid():
+            self.queue, self.files = Queue(maxsize=self.queue.maxsize), dict()
+            self.worker, self.pid = Thread(target=self.__run__, daemon=True), getpid()
+            self.worker.start()
+        item = filename, configuration, rule, conffitness, iterations
+        try:
+            self.queue.put_nowait(item)
+        except Full:
+            st = perf_counter()
+            self.queue.put(item)
+            self.blocked += 1
+            self.waited += perf_counter() - st
+            STATS.count('log blocked')
+            STATS.record('log backpressure', st)
+        self.highwater = max(self.highwater, self.queue.qsize())
+
+    def metrics(self):
+        return {'written': self.written, 'pending': self.queue.qsize(), 'blocked': self.blocked,
+                'waited': self.waited, 'highwater': self.highwater}
+
+    def close(self):
+        if self.pid == getpid():
+            self.queue.put(None)
+            self.worker.join()
+            self.worker, self.pid = None, None
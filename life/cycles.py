@@ -0,0 +1,32 @@
+from array import array
+from hashlib import blake2b
+from life.canonical import fingerprint, packed
+
+
+def shapeprint(parts):
+    digest = blake2b(digest_size=16)
+    for key, count in sorted((packed(shape, symmetric=False), count) for shape, count in parts.items()):
+        digest.update(array('q', [count, len(key)]).tobytes() + key)
+    return int.from_bytes(digest.digest(), 'little')
+
+
+class CycleDetector:
+    def __init__(self):
+        self.configurations = dict()
+        self.shapes = dict()
+        self.preperiod, self.period = 0, 0
+
+    def __found__(self, generation, first):
+        self.preperiod, self.period = first, generation - first
+        return self.period
+
+    def observe(self, generation, configuration, parts):
+        key = fingerprint(configuration, symmetric=False)
+        if key in self.configurations:
+            return self.__found__(generation, self.configurations[key])
+        self.configurations[key] = generation
+        key = shapeprint(parts())
+        if key in self.shapes:
+            return self.__found__(generation, self.shapes[key])
+        self.shapes[key] = generation
+        return 0
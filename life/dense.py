@@ -0,0 +1,61 @@
+import numpy as np
+from common.geometry import Point
+
+MARGIN = 8
+
+
+def __rule_table__(rule):
+    table = np.zeros((2, 9), dtype=bool)
+    table[0, [b for b in rule[0] if 0 < b <= 8]] = True
+    table[1, [s for s in rule[1] if 0 <= s <= 8]] = True
+    return table
+
+
+class DenseGrid:
+    def __init__(self, configuration=(), margin=MARGIN):
+        self.margin = margin
+        cells = np.array([(cell.y, cell.x) for cell in configuration], dtype=np.int64).reshape(-1, 2)
+        low = cells.min(axis=0) if len(cells) else np.zeros(2, dtype=np.int64)
+        high = cells.max(axis=0) if len(cells) else np.zeros(2, dtype=np.int64)
+        self.origin = low - margin
+        self.cells = np.zeros(tuple(high - low + 1 + 2 * margin), dtype=np.uint8)
+        self.cells[tuple((cells - self.origin).T)] = 1
+
+    def __len__(self): return int(self.cells.sum())
+
+    def configuration(self):
+        ys, xs = np.nonzero(self.cells)
+        oy, ox = (int(o) for o in self.origin)
+        return {Point(int(x) + ox, int(y) + oy) for y, x in zip(ys, xs)}
+
+    def __fit__(self):
+        ys, xs = np.nonzero(self.cells)
+        if len(ys) == 0:
+            return
+        low = np.array([ys.min(), xs.min()])
+        high = np.array([ys.max(), xs.max()])
+        shape = np.array(self.cells.shape)
+        if (low >= 1).all() and (high < shape - 1).all() and \
+                (low <= 4 * self.margin).all() and (high >= shape - 4 * self.margin).all():
+            return
+        cells = np.zeros(tuple(high - low + 1 + 2 * self.margin), dtype=np.uint8)
+        cells[self.margin:-self.margin, self.margin:-self.margin] = \
+            self.cells[low[0]:high[0] + 1, low[1]:high[1] + 1]
+        self.origin = self.origin + low - self.margin
+        self.cells = cells
+
+    def neighborhood(self):
+        padded = np.pad(self.cells, 1)
+        height, width = self.cells.shape
+        return sum(padded[dy:dy + height, dx:dx + width]
+                   for dy in range(3) for dx in range(3)
+                   if dy != 1 or dx != 1)
+
+    def advance(self, rule):
+        self.__fit__()
+        self.cells = __rule_table__(rule)[self.cells, self.neighborhood()].astype(np.uint8)
+        return self
+
+
+def advance(configuration, rule):
+    return DenseGrid(configuration).advance(rule).configuration()
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from life.canonical import fingerprint
+from os import makedirs
+from os.path import dirname
+from sqlite3 import connect
+
+MISSING = object()
+
+
+def __mask__(digits): return sum(1 << d for d in digits)
+
+
+class FitnessCache:
+    def __init__(self, size, filepath=None, context=''):
+        self.entries = OrderedDict()
+        self.size, self.filepath = size, filepath
+        self.context = blake2b(context.encode(), digest_size=8).digest()
+        self.db, self.pending = None, []
+        self.hits, self.lookups = 0, 0
+
+    def __store__(self):
+        if self.db is None:
+            makedirs(dirname(self.filepath), exist_ok=True)
+            self.db = connect(self.filepath)
+            self.db.execute("CREATE TABLE IF NOT EXISTS fitness (key BLOB PRIMARY KEY, fitness REAL)")
+        return self.db
+
+    def __remember__(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def key(self, configuration, rule):
+        return fingerprint(configuration, symmetric=False).to_bytes(16, 'little') + \
+            __mask__(rule[0]).to_bytes(2, 'little') + __mask__(rule[1]).to_bytes(2, 'little')
+
+    def get(self, key):
+        self.lookups += 1
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        if self.filepath:
+            row = self.__store__().execute("SELECT fitness FROM fitness WHERE key = ?",
+                                           (self.context + key,)).fetchone()
+            if row:
+                self.hits += 1
+                self.__remember__(key, row[0])
+                return row[0]
+        return MISSING
+
+    def put(self, key, value):
+        self.__remember__(key, value)
+        if self.filepath:
+            self.pending.append((self.context + key, value))
+
+    def flush(self):
+        if self.pending:
+            self.__store__().executemany("INSERT OR REPLACE INTO fitness VALUES (?, ?)", self.pending)
+            self.db.commit()
+            self.pending = []
+
+    def close(self):
+        self.flush()
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def hitrate(self):
+        return self.hits / self.lookups if self.lookups else 0
@@ -2,9 +2,10 @@ import threading
 from ctypes import pythonapi, py_object
 from common.config import readjson
 from gui.simplegui import MainWindow
-from life.life import LIFE, partition, advance
+from life.life import LIFE, Stepper, partition
+from life.population import Population
 from life.rleparser import from_rle, to_rle
-from life.simulation import bestfit, simulate
+from life.simulation import bestfit, executor, simulate
 from random import randrange
 from tkinter import BOTH, Canvas, Entry, StringVar
 
@@ -41,7 +42,7 @@ class Game:
         self.active = False
         self.cells = set()
         self.rule = LIFE
-        self.population = dict()
+        self.population = Population()
 
     def stop(self):
         self.active = False
@@ -51,15 +52,17 @@ class Game:
         self.reset()
         self.active = True
         if CONFIG['simulate']:
+            self.pool = executor()
             self.simulation = threading.Thread(target=self.runsimulation, daemon=True)
             self.simulation.start()
         draw(self.canvas, [], type(self).__name__)
         self.cells, self.rule = from_rle(self.config.get())
+        self.stepper = Stepper(self.cells, self.rule)
         self.iterate()
 
     def runsimulation(self):
         while True:
-            self.population = simulate(self.population)
+            self.population = simulate(self.population, self.pool)
 
     def stopsimulation(self):
         thread_id = self.simulation._thread_id if hasattr(self.simulation, '_thread_id') else \
@@ -67,17 +70,18 @@ class Game:
                  if thread is self.simulation)
         pythonapi.PyThreadState_SetAsyncExc(thread_id, py_object(SystemExit))
         self.simulation.join()
+        if self.pool:
+            self.pool.shutdown(cancel_futures=True)
 
     def iterate(self):
         if not self.active:
             return
         draw(self.canvas, partition(self.cells, 2), type(self).__name__)
-        newcells = advance(self.cells, self.rule)
-        if newcells == self.cells:
+        self.cells, changed = self.stepper.step()
+        if len(changed) == 0:
             _, (self.cells, self.rule) = bestfit(self.population)
+            self.stepper = Stepper(self.cells, self.rule)
             self.config.set(to_rle(self.cells, self.rule))
-        else:
-            self.cells = newcells
         self.canvas.after(Game.TIMER, self.iterate)
 
 
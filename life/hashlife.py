@@ -0,0 +1,149 @@
+from functools import lru_cache
+from typing import NamedTuple
+from common.geometry import Point
+
+CACHESIZE = 2**20
+
+
+class Node(NamedTuple):
+    hash: int
+    k: int
+    n: int
+    a: 'Node' = None
+    b: 'Node' = None
+    c: 'Node' = None
+    d: 'Node' = None
+
+    def __hash__(self): return self.hash
+
+
+ON = Node(hash=1, k=0, n=1)
+OFF = Node(hash=0, k=0, n=0)
+
+
+def __canonical_rule__(rule):
+    return frozenset(b for b in rule[0] if b > 0), frozenset(rule[1])
+
+
+@lru_cache(maxsize=CACHESIZE)
+def join(a, b, c, d):
+    return Node(hash=hash((a.k + 1, a.hash, b.hash, c.hash, d.hash)),
+                k=a.k + 1, n=a.n + b.n + c.n + d.n, a=a, b=b, c=c, d=d)
+
+
+@lru_cache(maxsize=64)
+def empty(k):
+    return OFF if k == 0 else join(*(empty(k - 1),) * 4)
+
+
+def centre(node):
+    e = empty(node.k - 1)
+    return join(join(e, e, e, node.a), join(e, e, node.b, e),
+                join(e, node.c, e, e), join(node.d, e, e, e))
+
+
+def __inner__(node):
+    return join(node.a.d, node.b.c, node.c.b, node.d.a)
+
+
+def __ispadded__(node):
+    return node.a.n == node.a.d.d.n and node.b.n == node.b.c.c.n and \
+        node.c.n == node.c.b.b.n and node.d.n == node.d.a.a.n
+
+
+def __life_4x4__(node, rule):
+    cells = [[node.a.a, node.a.b, node.b.a, node.b.b],
+             [node.a.c, node.a.d, node.b.c, node.b.d],
+             [node.c.a, node.c.b, node.d.a, node.d.b],
+             [node.c.c, node.c.d, node.d.c, node.d.d]]
+
+    def nextcell(y, x):
+        alive = cells[y][x].n
+        count = sum(cells[y + dy][x + dx].n for dy in (-1, 0, 1) for dx in (-1, 0, 1)) - alive
+        return ON if count in rule[alive] else OFF
+    return join(nextcell(1, 1), nextcell(1, 2), nextcell(2, 1), nextcell(2, 2))
+
+
+@lru_cache(maxsize=CACHESIZE)
+def successor(node, rule, j):
+    if node.n == 0:
+        return node.a
+    if node.k == 2:
+        return __life_4x4__(node, rule)
+    j = min(j, node.k - 2)
+    a, b, c, d = node.a, node.b, node.c, node.d
+    c1 = successor(join(a.a, a.b, a.c, a.d), rule, j)
+    c2 = successor(join(a.b, b.a, a.d, b.c), rule, j)
+    c3 = successor(join(b.a, b.b, b.c, b.d), rule, j)
+    c4 = successor(join(a.c, a.d, c.a, c.b), rule, j)
+    c5 = successor(join(a.d, b.c, c.b, d.a), rule, j)
+    c6 = successor(join(b.c, b.d, d.a, d.b), rule, j)
+    c7 = successor(join(c.a, c.b, c.c, c.d), rule, j)
+    c8 = successor(join(c.b, d.a, c.d, d.c), rule, j)
+    c9 = successor(join(d.a, d.b, d.c, d.d), rule, j)
+    if j < node.k - 2:
+        return join(join(c1.d, c2.c, c4.b, c5.a), join(c2.d, c3.c, c5.b, c6.a),
+                    join(c4.d, c5.c, c7.b, c8.a), join(c5.d, c6.c, c8.b, c9.a))
+    return join(successor(join(c1, c2, c4, c5), rule, j), successor(join(c2, c3, c5, c6), rule, j),
+                successor(join(c4, c5, c7, c8), rule, j), successor(join(c5, c6, c8, c9), rule, j))
+
+
+def __build__(cells, x, y, k):
+    if len(cells) == 0:
+        return empty(k)
+    if k == 0:
+        return ON
+    half = 1 << (k - 1)
+    quadrants = [], [], [], []
+    for cell in cells:
+        quadrants[(cell.x >= x + half) + 2 * (cell.y >= y + half)].append(cell)
+    return join(__build__(quadrants[0], x, y, k - 1), __build__(quadrants[1], x + half, y, k - 1),
+                __build__(quadrants[2], x, y + half, k - 1), __build__(quadrants[3], x + half, y + half, k - 1))
+
+
+def construct(configuration):
+    cells = list(configuration)
+    if len(cells) == 0:
+        return empty(2), Point()
+    origin = Point(min(cell.x for cell in cells), min(cell.y for cell in cells))
+    side = max(max(cell.x for cell in cells) - origin.x, max(cell.y for cell in cells) - origin.y) + 1
+    k = max(2, (side - 1).bit_length())
+    return __build__(cells, origin.x, origin.y, k), origin
+
+
+def expand(node, origin=Point()):
+    if node.n == 0:
+        return
+    if node.k == 0:
+        yield origin
+        return
+    half = 1 << (node.k - 1)
+    yield from expand(node.a, origin)
+    yield from expand(node.b, Point(origin.x + half, origin.y))
+    yield from expand(node.c, Point(origin.x, origin.y + half))
+    yield from expand(node.d, Point(origin.x + half, origin.y + half))
+
+
+def __pad__(node, origin, j):
+    while node.k < j + 3 or not __ispadded__(node):
+        origin = origin.shift(-(1 << (node.k - 1)))
+        node = centre(node)
+    return node, origin
+
+
+def advance_node(node, origin, rule, n):
+    rule = __canonical_rule__(rule)
+    for j in reversed(range(n.bit_length())):
+        if n & (1 << j):
+            node, origin = __pad__(node, origin, j)
+            origin = origin.shift(1 << (node.k - 2))
+            node = successor(node, rule, j)
+    return node, origin
+
+
+def advance_n(configuration, rule, n):
+    return set(expand(*advance_node(*construct(configuration), rule, n)))
+
+
+def advance(configuration, rule):
+    return advance_n(configuration, rule, 1)
@@ -0,0 +1,106 @@
+from common.config import readjson
+from multiprocessing import Process, Queue
+from queue import Empty
+from random import getrandbits, seed as randseed
+from time import perf_counter
+from traceback import format_exc
+from life.population import Population
+from life.simulation import CONFIG as GACONFIG, __add__, avgfitness, bestfit, iterate, logdata, report, seed, sizepop
+
+
+CONFIG = readjson(__file__)
+TOPOLOGIES = {'ring': lambda k, n: [(k + 1) % n],
+              'full': lambda k, n: [i for i in range(n) if i != k]}
+
+
+def __arrive__(population, arrivals):
+    for fit, (configuration, rule) in arrivals or ():
+        population = __add__(population, fit, configuration, rule)
+    return population, arrivals is None
+
+
+def migrate(population, inbox, outboxes, migrants):
+    for outbox in outboxes:
+        outbox.put(population.elite(migrants))
+    finished = 0
+    while True:
+        try:
+            population, done = __arrive__(population, inbox.get_nowait())
+        except Empty:
+            return population, finished
+        finished += done
+
+
+def retire(inbox, outboxes, senders, finished):
+    for outbox in outboxes:
+        outbox.put(None)
+    while finished < senders:
+        finished += inbox.get() is None
+
+
+def island(index, islandseed, inbox, outboxes, senders, stats):
+    randseed(islandseed)
+    pop = Population()
+    s, finished = 0, 0
+    try:
+        for i in range(CONFIG['iterations']):
+            pop = seed(pop, GACONFIG['random inserts'])
+            st = perf_counter()
+            pop = iterate(pop, GACONFIG['replacements'], GACONFIG['advances'], GACONFIG['max size'])
+            t = (perf_counter() - st) / GACONFIG['replacements']
+            s += t
+            if i % CONFIG['migration interval'] == CONFIG['migration interval'] - 1:
+                pop, done = migrate(pop, inbox, outboxes, CONFIG['migrants'])
+                finished += done
+            stats.put((index, i, t, s/(i+1), sizepop(pop), avgfitness(pop), bestfit(pop)))
+    except Exception:
+        stats.put("island {} failed\n{}".format(index, format_exc()))
+        senders = 0
+    finally:
+        retire(inbox, outboxes, senders, finished)
+        stats.put(None)
+
+
+def run():
+    n = CONFIG['islands']
+    inboxes, stats = [Queue() for _ in range(n)], Queue()
+    targets = [TOPOLOGIES[CONFIG['topology']](k, n) for k in range(n)]
+    processes = [Process(target=island, daemon=True,
+                         args=(k, getrandbits(64), inboxes[k], [inboxes[i] for i in targets[k]],
+                               sum(k in peers for peers in targets), stats))
+                 for k in range(n)]
+    for process in processes:
+        process.start()
+    currmax, currbest = 1, set()
+    s, rounds, running = 0, dict(), n
+    while running:
+        entry = stats.get()
+        if entry is None:
+            running -= 1
+            continue
+        if isinstance(entry, str):
+            for process in processes:
+                process.terminate()
+            raise RuntimeError(entry)
+        k, i, t, avgt, size, avg, (maxfit, _) = entry
+        report("{}[{}]".format(i, k), t, avgt, size, avg, maxfit)
+        rounds.setdefault(i, []).append(entry)
+        if len(rounds[i]) < n:
+            continue
+        entries = rounds.pop(i)
+        t = sum(e[2] for e in entries) / n
+        s += t
+        size = sum(e[4] for e in entries)
+        avg = sum(e[4] * e[5] for e in entries) / size
+        maxfit, (bestconf, bestrule) = max((e[6] for e in entries), key=lambda x: (x[0], -len(x[1][0])))
+        report("{}[*]".format(i), t, s/(i+1), size, avg, maxfit)
+        if currmax < maxfit or (currmax == maxfit and
+                                len(bestconf) < len(currbest) or i % 50 == 49):
+            currmax, currbest = maxfit, bestconf
+            logdata(bestconf, bestrule, maxfit)
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    run()
@@ -1,5 +1,8 @@
 from collections import Counter
 from common.geometry import Point
+from life.canonical import canonical, fingerprint
+from life import packed
+from life.components import components
 from random import randint, sample
 
 LIFE = {3}, {2, 3}
@@ -32,54 +35,105 @@ def neighbors(cell, distance):
 
 
 def energy(configuration):
-    return Counter(e for cell in configuration for e in neighbors(cell, 1))
+    return Counter({packed.unpack(key): en for key, en in packed.energy(packed.packall(configuration)).items()})
+
+
+class SparseGrid:
+    def __init__(self, configuration=()):
+        self.keys = packed.packall(configuration)
+
+    def __len__(self): return len(self.keys)
+    def configuration(self): return packed.unpackall(self.keys)
+
+    def advance(self, rule):
+        self.keys = packed.advance(self.keys, rule)
+        return self
 
 
 def advance(configuration, rule):
-    return {cell for cell, en in energy(configuration).items()
-            if en - 1*(cell in configuration) in rule[1*(cell in configuration)]}
+    return SparseGrid(configuration).advance(rule).configuration()
+
+
+class Stepper:
+    def __init__(self, configuration, rule, engine=None):
+        self.configuration = set(configuration)
+        self.rule = rule
+        self.grid = engine(self.configuration) if engine else None
+        self.keys = None if engine else packed.packall(self.configuration)
+        self.energy, self.region = None, None
+        self.changed = None
+
+    def __changes__(self, energy, candidates):
+        return {key for key in candidates
+                if (energy[key] > 0 and energy[key] - (key in self.keys) in self.rule[key in self.keys])
+                != (key in self.keys)}
+
+    def __update__(self, changed):
+        self.energy.update(packed.neighborhood(changed - self.keys))
+        for key, en in Counter(packed.neighborhood(changed & self.keys)).items():
+            if self.energy[key] == en:
+                del self.energy[key]
+            else:
+                self.energy[key] -= en
+
+    def step(self):
+        if self.grid is not None:
+            nextconf = self.grid.advance(self.rule).configuration()
+            self.changed = nextconf ^ self.configuration
+            self.configuration = nextconf
+            return self.configuration, self.changed
+        if self.region is None:
+            self.energy = None
+            energy = packed.energy(self.keys)
+            changed = self.__changes__(energy, energy)
+        else:
+            if self.energy is None:
+                self.energy = packed.energy(self.keys)
+            changed = self.__changes__(self.energy, self.region)
+            self.__update__(changed)
+        self.keys ^= changed
+        self.region = set(packed.neighborhood(changed)) if 4 * len(changed) < len(self.keys) else None
+        self.changed = packed.unpackall(changed)
+        self.configuration = self.configuration ^ self.changed
+        return self.configuration, self.changed
 
 
 def partition(configuration, distance):
-    sub = set(configuration)
-    while len(sub) != 0:
-        visited = {sub.pop()}
-        part = set(visited)
-        while len(visited) != 0 and len(sub) != 0:
-            visited |= set(neighbors(visited.pop(), distance)) & sub
-            part |= visited
-            sub -= visited
-        yield part
+    yield from components(configuration, distance)
+
+
+def energyprofile(part):
+    return frozenset(Counter(packed.energy(packed.packall(part)).values()).items())
 
 
 def profile(configuration, distance):
-    return Counter(frozenset(Counter(energy(part).values()).items())
-                   for part in partition(configuration, distance))
+    return Counter(map(energyprofile, partition(configuration, distance)))
 
 
 def centralize(configuration):
-    minpoint = Point(min(configuration).x, min(configuration, key=lambda p: p.y).y)
-    return {cell - minpoint for cell in configuration}
+    minx, miny = min(cell.x for cell in configuration), min(cell.y for cell in configuration)
+    return {Point(cell.x - minx, cell.y - miny) for cell in configuration}
 
 
-def split(configuration, distance):
-    return Counter(map(lambda part: frozenset(centralize(part)), partition(configuration, distance)))
+def split(configuration, distance, symmetric=False):
+    return Counter(map(lambda part: canonical(part) if symmetric else frozenset(centralize(part)),
+                       partition(configuration, distance)))
 
 
 def isstill(configuration, rule, limit):
-    nextconf = configuration
+    stepper = Stepper(configuration, rule)
     for _ in range(limit):
-        nextconf = advance(nextconf, rule)
+        nextconf, _ = stepper.step()
         if(configuration == nextconf):
             return True
     return False
 
 
 def cycle(configuration, rule, limit):
-    ref = centralize(configuration)
-    nextconf = configuration
+    ref = fingerprint(configuration, symmetric=False)
+    stepper = Stepper(configuration, rule)
     for i in range(limit):
-        nextconf = advance(nextconf, rule)
-        if(ref == centralize(nextconf)):
+        nextconf, _ = stepper.step()
+        if(ref == fingerprint(nextconf, symmetric=False)):
             return i+1
     return 0
@@ -0,0 +1,87 @@
+from re import compile
+from common.geometry import Point
+from life.hashlife import centre, construct, expand
+from life.life import LIFE
+
+__rule_regex__ = compile(r'#R\s*B(\d*)/S(\d*)')
+LEAFLEVEL = 3
+
+
+def __leaf__(line):
+    bits, x, y = 0, 0, 0
+    for char in line.strip():
+        if char == '$':
+            x, y = 0, y + 1
+        else:
+            bits |= (char == '*') << (y * 8 + x)
+            x += 1
+    return bits
+
+
+def __expand__(nodes, index, origin):
+    if index == 0:
+        return
+    node = nodes[index]
+    if isinstance(node, int):
+        yield [Point(origin.x + bit % 8, origin.y + bit // 8) for bit in range(64) if node >> bit & 1]
+        return
+    half = 1 << (node[0] - 1)
+    for i, child in enumerate(node[1:]):
+        yield from __expand__(nodes, child, Point(origin.x + half * (i % 2), origin.y + half * (i // 2)))
+
+
+def __mc_cells__(file, line):
+    nodes = [None]
+    while line:
+        line = line.strip()
+        if line and line[0] in '.*$':
+            nodes.append(__leaf__(line))
+        elif line and line[0].isdigit():
+            nodes.append(tuple(int(field) for field in line.split()))
+        line = file.readline()
+    yield from __expand__(nodes, len(nodes) - 1, Point())
+
+
+def read_mc(file):
+    rule, line = LIFE, file.readline()
+    while line.startswith('[') or line.startswith('#'):
+        rule_match = __rule_regex__.match(line)
+        if rule_match:
+            rule = frozenset(int(d) for d in rule_match[1]), frozenset(int(d) for d in rule_match[2])
+        line = file.readline()
+    return rule, __mc_cells__(file, line)
+
+
+def __leaf_line__(node):
+    rows = [['.'] * 8 for _ in range(8)]
+    for cell in expand(node):
+        rows[cell.y][cell.x] = '*'
+    rows = [''.join(row).rstrip('.') for row in rows]
+    while rows and rows[-1] == '':
+        rows.pop()
+    return ''.join(row + '$' for row in rows) + '\n'
+
+
+def __write_node__(file, node, indexes):
+    if node.n == 0:
+        return 0
+    if node not in indexes:
+        line = __leaf_line__(node) if node.k == LEAFLEVEL else \
+            ' '.join(str(i) for i in (node.k, *(__write_node__(file, child, indexes)
+                                               for child in (node.a, node.b, node.c, node.d)))) + '\n'
+        file.write(line)
+        indexes[node] = len(indexes) + 1
+    return indexes[node]
+
+
+def write_mc(file, configuration, rule=LIFE):
+    file.write("[M2] (life)\n")
+    file.write("#R B" + ''.join(str(b) for b in sorted(rule[0])) +
+               "/S" + ''.join(str(s) for s in sorted(rule[1])) + "\n")
+    node, _ = construct(configuration)
+    while node.k < LEAFLEVEL:
+        node = centre(node)
+    if node.n == 0:
+        file.write("$\n")
+        return
+    __write_node__(file, node, dict())
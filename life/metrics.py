@@ -1,20 +1,26 @@
-from life.life import cycle, isstill, profile, split
+from life.analysis import Analysis
+from life.stats import STATS
 
 
 def measure(metric, rundata):
-    return globals()['_'.join(metric.split())](rundata)
+    if 'analysis' not in rundata:
+        rundata['analysis'] = Analysis(rundata['configuration'], rundata['rule'])
+    st = STATS.clock()
+    result = globals()['_'.join(metric.split())](rundata)
+    STATS.record('metric ' + metric, st)
+    return result
 
 
 def most_diff_shapes(rundata):
-    return len([part for part in split(rundata['configuration'], 1).keys() if len(part) > 1])
+    return len([part for part in rundata['analysis'].split(1).keys() if len(part) > 1])
 
 
 def most_diff_parts(rundata):
-    return len([part for part in profile(rundata['configuration'], 1).keys() if len(part) > 1])
+    return len([part for part in rundata['analysis'].profile(1).keys() if len(part) > 1])
 
 
 def most_diff_groups(rundata):
-    return len([part for part in profile(rundata['configuration'], 2).keys() if len(part) > 1])
+    return len([part for part in rundata['analysis'].profile(2).keys() if len(part) > 1])
 
 
 def longest(rundata):
@@ -26,46 +32,50 @@ def longest_cycle(rundata):
 
 
 def biggest_part(rundata):
-    return max(len(part) for part in split(rundata['configuration'], 1))
+    return max(len(part) for part in rundata['analysis'].split(1))
 
 
 def biggest_group(rundata):
-    return max(len(part) for part in split(rundata['configuration'], 2))
+    return max(len(part) for part in rundata['analysis'].split(2))
 
 
 def most_moving_parts(rundata):
-    return max(sum([occur for part, occur in split(rundata['configuration'], 2).items()
-                    if not isstill(part, rundata['rule'], rundata['cyclesize'])]), 0.5)
+    analysis = rundata['analysis']
+    return max(sum([occur for part, occur in analysis.split(2).items()
+                    if not analysis.isstill(part, rundata['cyclesize'])]), 0.5)
 
 
 def most_non_still(rundata):
-    return max(sum([occur for part, occur in split(rundata['configuration'], 1).items()
-                    if not isstill(part, rundata['rule'], 1)]), 0.5)
+    analysis = rundata['analysis']
+    return max(sum([occur for part, occur in analysis.split(1).items()
+                    if not analysis.isstill(part, 1)]), 0.5)
 
 
 def biggest_non_still(rundata):
-    r = [len(part) for part, _ in split(rundata['configuration'],
-                                        2).items() if not isstill(part, rundata['rule'], 3)]
+    analysis = rundata['analysis']
+    r = [len(part) for part, _ in analysis.split(2).items() if not analysis.isstill(part, 3)]
     return max(r) if len(r) else 0.5
 
 
 def total_moving_parts(rundata):
-    return max(sum([(len(part)**2) * occur for part, occur in split(rundata['configuration'], 2).items()
-                    if not isstill(part, rundata['rule'], rundata['cyclesize'])]), 1)
+    analysis = rundata['analysis']
+    return max(sum([(len(part)**2) * occur for part, occur in analysis.split(2).items()
+                    if not analysis.isstill(part, rundata['cyclesize'])]), 1)
 
 
 def weighted_parts(rundata):
-    def func(x): return sum(split(x[0], 1).values()) * x[1] if isstill(x[0], rundata['rule'], rundata['cyclesize']) \
+    analysis = rundata['analysis']
+    def func(x): return analysis.count(x[0], 1) * x[1] if analysis.isstill(x[0], rundata['cyclesize']) \
         else rundata['moving weight'] * x[1]
-    return sum(map(func, split(rundata['configuration'], 2).items()))
+    return sum(map(func, analysis.split(2).items()))
 
 
 def most_parts(rundata):
-    return sum(split(rundata['configuration'], 2).values())
+    return sum(rundata['analysis'].split(2).values())
 
 
 def most_shapes(rundata):
-    return sum(split(rundata['configuration'], 1).values())
+    return sum(rundata['analysis'].split(1).values())
 
 
 def biggest(rundata):
@@ -77,4 +87,5 @@ def most_growth(rundata):
 
 
 def cycle_part(rundata):
-    return max([cycle(part, rundata['rule'], 50) for part in split(rundata['configuration'], 2).keys()])
+    analysis = rundata['analysis']
+    return max([analysis.cycle(part, 50) for part in analysis.split(2).keys()])
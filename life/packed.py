@@ -0,0 +1,39 @@
+from collections import Counter
+from common.geometry import Point
+
+SHIFT = 32
+OFFSET = 1 << (SHIFT - 1)
+
+
+def pack(cell): return (cell.y << SHIFT) + cell.x
+
+
+def unpack(key):
+    y = (key + OFFSET) >> SHIFT
+    return Point(key - (y << SHIFT), y)
+
+
+def packall(configuration): return {pack(cell) for cell in configuration}
+def unpackall(keys): return {unpack(key) for key in keys}
+
+
+def offsets(distance, center=True):
+    return [(dy << SHIFT) + dx for dy in range(-distance, distance + 1)
+            for dx in range(-distance, distance + 1) if center or dx or dy]
+
+
+NEIGHBORHOOD = offsets(1)
+
+
+def neighborhood(keys, distance=1):
+    deltas = NEIGHBORHOOD if distance == 1 else offsets(distance)
+    return (key + delta for key in keys for delta in deltas)
+
+
+def energy(keys):
+    return Counter(neighborhood(keys))
+
+
+def advance(keys, rule):
+    return {key for key, en in energy(keys).items()
+            if en - (key in keys) in rule[key in keys]}
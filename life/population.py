@@ -0,0 +1,78 @@
+from random import random
+from life.canonical import fingerprint
+
+EMPTY = 0, (set(), (frozenset(), frozenset()))
+DEFAULT = 0.5
+
+
+def key(configuration, rule):
+    return fingerprint(configuration), frozenset(rule[0]), frozenset(rule[1])
+
+
+class Population:
+    def __init__(self, individuals=()):
+        self.individuals = []
+        self.keys = []
+        self.index = set()
+        self.tree = [0]
+        self.total = 0
+        self.minimum, self.maximum = None, None
+        self.best = EMPTY
+        for fitness, (configuration, rule) in individuals:
+            self.add(fitness, configuration, rule)
+
+    def __len__(self): return len(self.individuals)
+    def __iter__(self): return iter(self.individuals)
+    def __contains__(self, individual): return key(*individual) in self.index
+
+    def __prefix__(self, i):
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def __search__(self, value):
+        i, step = 0, 1 << len(self.tree).bit_length()
+        while step:
+            if i + step < len(self.tree) and self.tree[i + step] <= value:
+                i += step
+                value -= self.tree[i]
+            step >>= 1
+        return min(i, len(self.individuals) - 1)
+
+    def add(self, fitness, configuration, rule, k=None):
+        k = key(configuration, rule) if k is None else k
+        if k in self.index:
+            return False
+        self.index.add(k)
+        self.keys.append(k)
+        self.individuals.append((fitness, (configuration, rule)))
+        i = len(self.tree)
+        self.tree.append(fitness + self.__prefix__(i - 1) - self.__prefix__(i - (i & -i)))
+        self.total += fitness
+        self.minimum = fitness if self.minimum is None else min(self.minimum, fitness)
+        self.maximum = fitness if self.maximum is None else max(self.maximum, fitness)
+        if len(self) == 1 or fitness > self.best[0] or (fitness == self.best[0] and len(configuration) < len(self.best[1][0])):
+            self.best = fitness, (configuration, rule)
+        return True
+
+    def average(self):
+        return self.total / len(self) if len(self) else DEFAULT
+
+    def min(self):
+        return self.minimum if len(self) else DEFAULT
+
+    def max(self):
+        return self.maximum if len(self) else DEFAULT
+
+    def bestfit(self):
+        return self.best
+
+    def sample(self):
+        if len(self) == 0:
+            return EMPTY
+        return self.individuals[self.__search__(random() * self.total)]
+
+    def elite(self, size):
+        return sorted(self.individuals, key=lambda x: (-x[0], len(x[1][0])))[:size]
@@ -1,11 +1,14 @@
-from itertools import chain, takewhile
+from itertools import chain
 from re import compile
 from common.geometry import Point
 from life.life import LIFE
+from life.packed import pack, packall, unpack
 
 __config_regex__ = compile(r'(\d*)([bo$!])')
 __rule_regex__ = compile(r'.*\srule\s*=\s*B\s*(\d+).*S\s*(\d+)')
 __config_rule_regex__ = compile(r'B(\d+)S(\d+)')
+__tail_regex__ = compile(r'\d*\Z')
+CHUNKSIZE = 2**16
 
 
 def parse_rule(rulestr):
@@ -28,40 +31,118 @@ def from_rle(rlestring):
             p = Point(0, p.y + digit)
         else:
             if partrle[1] == 'o':
-                configuration |= {Point(p.x + i, p.y) for i in range(digit)}
+                configuration.update(Point(p.x + i, p.y) for i in range(digit))
             p = Point(p.x + digit, p.y)
     return configuration, rule
 
 
-def __adj_parts_rle__(sortedconfiguration, point, minX):
-    def prev(cell): 
-        return sortedconfiguration[sortedconfiguration.index(cell) - 1]
-    def func(cell): 
-        return cell == sortedconfiguration[0] or \
-            (cell.y == prev(cell).y and cell.x == prev(cell).x + 1)
-    while len(sortedconfiguration):
-        adjpart = list(takewhile(func, sortedconfiguration))
-        if point.y != adjpart[0].y:
-            point = Point(minX, point.y)
-        yield '$'*(adjpart[0].y - point.y) + \
-            (str(adjpart[0].x - point.x - 1) if adjpart[0].x - point.x > 2 else "") +\
-            ("b" if adjpart[0].x != point.x + 1 else "") + \
-            (str(len(adjpart)) if len(adjpart) > 1 else "") + "o"
-        sortedconfiguration = sortedconfiguration[len(adjpart):]
-        point = adjpart[-1]
-
-
-def to_rle(configuration, rule=None):
+def __rle_rule__(line):
+    rule_match = __rule_regex__.match(line)
+    return (frozenset(int(d) for d in rule_match[1]), frozenset(int(d) for d in rule_match[2])) \
+        if rule_match else LIFE
+
+
+def __rle_cells__(file, data, chunksize):
+    x, y, row = 0, 0, []
+    while data:
+        end = 0
+        for partrle in __config_regex__.finditer(data):
+            end = partrle.end()
+            digit = int(partrle[1]) if partrle[1] != '' else 1
+            if partrle[2] == '!':
+                if len(row):
+                    yield row
+                return
+            if partrle[2] == '$':
+                if len(row):
+                    yield row
+                x, y, row = 0, y + digit, []
+            else:
+                if partrle[2] == 'o':
+                    row += [Point(x + i, y) for i in range(digit)]
+                x += digit
+        if len(row):
+            yield row
+            row = []
+        chunk = file.read(chunksize)
+        data = __tail_regex__.search(data, end)[0] + chunk if chunk else ''
+
+
+def read_rle(file, chunksize=CHUNKSIZE):
+    line = file.readline()
+    while line.startswith('#'):
+        line = file.readline()
+    if not line.lstrip().startswith('x'):
+        return LIFE, __rle_cells__(file, line, chunksize)
+    return __rle_rule__(line), __rle_cells__(file, file.read(chunksize), chunksize)
+
+
+def write_rle(file, configuration, rule=None, width=70):
+    if len(configuration) == 0:
+        return
+    if rule is not None:
+        file.write(__rle_header__(configuration, rule))
+    states = configuration if isinstance(configuration, dict) else None
+    for line in __wrap__(__rle_tokens__(configuration, states), width):
+        file.write(line)
+
+
+def __state_tag__(state):
+    return ('' if state <= 24 else chr(ord('p') + (state - 25) // 24)) + chr(ord('A') + (state - 1) % 24)
+
+
+def __runs__(keys, states):
+    start = 0
+    for i in range(1, len(keys) + 1):
+        if i < len(keys) and keys[i] == keys[i - 1] + 1 and \
+                (states is None or states[keys[i]] == states[keys[start]]):
+            continue
+        yield keys[start], i - start
+        start = i
+
+
+def __rle_tokens__(configuration, states=None):
+    dead = 'b' if states is None else '.'
+    keys = sorted(packall(configuration))
+    states = None if states is None else {pack(cell): state for cell, state in states.items()}
+    minx, prevy = min(cell.x for cell in configuration), unpack(keys[0]).y
+    prevx = minx - 1
+    for key, length in __runs__(keys, states):
+        cell = unpack(key)
+        if cell.y != prevy:
+            yield from '$' * (cell.y - prevy)
+            prevy, prevx = cell.y, minx - 1
+        if cell.x - prevx > 1:
+            yield (str(cell.x - prevx - 1) if cell.x - prevx > 2 else "") + dead
+        yield (str(length) if length > 1 else "") + \
+            ('o' if states is None else __state_tag__(states[key]))
+        prevx = cell.x + length - 1
+    yield '!'
+
+
+def __wrap__(tokens, width):
+    line = ''
+    for token in tokens:
+        if len(line) + len(token) > width:
+            yield line + '\n'
+            line = ''
+        line += token
+    yield line
+
+
+def __rle_header__(configuration, rule):
+    minpoint = Point(min(cell.x for cell in configuration), min(cell.y for cell in configuration))
+    configsize = (Point(max(cell.x for cell in configuration),
+                        max(cell.y for cell in configuration)) - minpoint).shift(1)
+    return "x=" + str(configsize.x) + ", " + "y=" + str(configsize.y) + ", " + \
+        "rule=" + ("B" + ''. join(str(b) for b in sorted(rule[0])) if len(rule[0]) else "") + \
+        ("/S" + ''. join(str(s) for s in sorted(rule[1])) if len(rule[1]) else "") + "\n"
+
+
+def to_rle(configuration, rule=None, width=None):
     if len(configuration) == 0:
         return ""
-    xsorted = sorted(configuration)
-    ysorted = sorted(configuration, key=lambda cell: cell.y +
-                     (cell.x / (abs(xsorted[-1].x) + 1)))
-    minpoint = Point(xsorted[0].x, ysorted[0].y)
-    configsize = (Point(xsorted[-1].x, ysorted[-1].y) - minpoint).shift(1)
-    s = "" if rule is None else \
-        ("x=" + str(configsize.x) + ", " + "y=" + str(configsize.y) + ", " +
-         "rule=" + ("B" + ''. join(str(b) for b in sorted(rule[0])) if len(rule[0]) else "") +
-         ("/S" + ''. join(str(s) for s in sorted(rule[1])) if len(rule[1]) else "") + "\n")
-    minpoint = Point(minpoint.x - 1, minpoint.y)
-    return ''.join(chain(s, __adj_parts_rle__(ysorted, minpoint, minpoint.x), "!"))
+    states = configuration if isinstance(configuration, dict) else None
+    tokens = __rle_tokens__(configuration, states)
+    return ''.join(chain("" if rule is None else __rle_header__(configuration, rule),
+                         tokens if width is None else __wrap__(tokens, width)))
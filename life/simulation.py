@@ -1,17 +1,64 @@
+from argparse import ArgumentParser
+from collections import Counter
 from common.config import readjson
-from itertools import chain
-from life.config import log
-from life.life import advance, partition, neighbors, seed_configuration, seed_rule, split
+from concurrent.futures import ProcessPoolExecutor
+from life import checkpoint, dense
+from life.analysis import Analysis
+from life.config import Logger
+from life.cycles import CycleDetector
+from life.fitnesscache import MISSING, FitnessCache
+from life.life import SparseGrid, Stepper, partition, neighbors, seed_configuration, seed_rule, split
 from life.metrics import measure
+from life.population import Population
 from life.rleparser import parse_rule
-from random import choice, choices, randint
+from life.stats import STATS
+from os import cpu_count, makedirs
+from os.path import dirname, exists, join, splitext
+from random import choice, choices, getrandbits, getstate, randint, seed as randseed, setstate
 from threading import Thread
-from time import process_time
-
-
-CONFIG = readjson(__file__)
-LOGFILE = '_'. join(
-    [str(CONFIG['advances']), *CONFIG['metric'].split()]) + ".log"
+from time import perf_counter
+
+
+DEFAULTS = readjson(__file__)
+CONFIG = dict(DEFAULTS)
+ENGINES = {'incremental': None, 'sparse': SparseGrid, 'dense': dense.DenseGrid}
+SAVINGS = Counter()
+CACHE = None
+LOGGER = None
+
+
+def configure(overrides=None):
+    global LOGFILE, ENGINE, LOGGER, BUDGET, WINDOW, CHECKPOINT
+    CONFIG.clear()
+    CONFIG.update(DEFAULTS, **(overrides or dict()))
+    LOGFILE = '_'. join(
+        [str(CONFIG['advances']), *CONFIG['metric'].split()]) + ".log"
+    ENGINE = ENGINES[CONFIG['engine']] if 'engine' in CONFIG else None
+    STATS.enabled = bool(CONFIG['stats']) if 'stats' in CONFIG else False
+    if LOGGER is None or (LOGGER.queue.maxsize, LOGGER.interval) != (CONFIG['log queue'], CONFIG['log interval']):
+        if LOGGER:
+            LOGGER.close()
+        LOGGER = Logger(__file__, CONFIG['log queue'], CONFIG['log interval'])
+    BUDGET = CONFIG['budget'] if 'budget' in CONFIG else None
+    WINDOW = CONFIG['prescreen window'] if 'prescreen window' in CONFIG else 0
+    resetcache()
+    CHECKPOINT = join(dirname(__file__), "log", '_'.join(
+        [splitext(CONFIG['checkpoint'])[0], str(CONFIG['advances']), *CONFIG['metric'].split()])
+        + splitext(CONFIG['checkpoint'])[1]) if 'checkpoint' in CONFIG and CONFIG['checkpoint'] else None
+
+
+def resetcache(store=True):
+    global CACHE
+    if CACHE:
+        CACHE.close()
+    CACHE = FitnessCache(CONFIG['fitness cache'],
+                         join(dirname(__file__), "log", CONFIG['fitness store'])
+                         if store and CONFIG['fitness store'] else None,
+                         ' '.join(str(CONFIG[k]) for k in ('metric', 'advances', 'max size', 'moving weight', 'rule'))) \
+        if 'fitness cache' in CONFIG and CONFIG['fitness cache'] else None
+
+
+configure()
 
 
 def crossover(configuration1, configuration2):
@@ -24,48 +71,103 @@ def mutate(configuration, proportion):
     return cpy | {choice([*neighbors(cpy.pop(), 1)]) for _ in range(int(len(configuration)*proportion))}
 
 
-def cyclesize(history):
-    try:
-        return len(history) - history[:-1].index(history[-1])
-    except ValueError:
-        return 0
+class Evaluation:
+    def __init__(self, configuration, rule, times, currmin, limit, budget=None, window=0):
+        self.configuration, self.rule = configuration, rule
+        self.times, self.currmin, self.limit = times, currmin, limit
+        self.budget, self.window = budget, window
+        self.stepper, self.detector = None, None
+        self.current, self.generation, self.cost = configuration, 0, 0
+        self.trend = []
+        self.result, self.pruned, self.measured = None, False, False
+
+    def __start__(self):
+        self.stepper = Stepper(self.configuration, self.rule, ENGINE)
+        self.detector = CycleDetector()
+        self.detector.observe(0, self.configuration, lambda: split(self.configuration, 2))
+
+    def __resolve__(self, result, pruned=False, measured=False):
+        self.result, self.pruned, self.measured = result, pruned, measured
+        self.stepper, self.detector, self.current, self.trend = None, None, None, None
+        return result
+
+    def __exploding__(self, configuration):
+        xs, ys = [cell.x for cell in configuration], [cell.y for cell in configuration]
+        self.trend = [*self.trend[-self.window:],
+                      (len(configuration), (max(xs) - min(xs) + 1) * (max(ys) - min(ys) + 1))]
+        if len(self.trend) <= self.window or \
+                any(a >= b for (a, _), (b, _) in zip(self.trend, self.trend[1:])) or \
+                any(a >= b for (_, a), (_, b) in zip(self.trend, self.trend[1:])):
+            return False
+        growth = self.trend[-1][0] / self.trend[0][0]
+        return self.trend[-1][0] * growth ** ((self.times - self.generation) / self.window) > self.limit
+
+    def run(self, until=None):
+        until = self.times if until is None else until
+        if self.detector is None:
+            self.__start__()
+        for i in range(self.generation + 1, until):
+            self.generation = i
+            st = STATS.clock()
+            nextconf, _ = self.stepper.step()
+            STATS.record('advance', st)
+            STATS.count('steps')
+            STATS.count('cells', len(nextconf))
+            self.cost += len(nextconf)
+            if len(nextconf) == 0:
+                return self.__resolve__(0, measured=True)
+            if len(nextconf) > self.limit:
+                return self.__resolve__(self.currmin)
+            if self.budget and self.cost > self.budget or self.window and self.__exploding__(nextconf):
+                return self.halt()
+            analysis = Analysis(nextconf, self.rule)
+            st = STATS.clock()
+            cycle = self.detector.observe(i, nextconf, lambda: analysis.split(2))
+            STATS.record('cycle detection', st)
+            if cycle:
+                return self.__resolve__(measure(CONFIG['metric'],
+                                                {'origin': self.configuration,
+                                                 'configuration': nextconf,
+                                                 'rule': self.rule,
+                                                 'analysis': analysis,
+                                                 'moving weight': CONFIG['moving weight'],
+                                                 'iterations': i,
+                                                 'cyclesize': cycle + 1}), measured=True)
+        self.current = self.stepper.configuration
+        # logdata(configuration, rule, currmin, i)
+        return self.__resolve__(self.currmin) if until >= self.times else None
+
+    def score(self):
+        return measure(CONFIG['metric'],
+                       {'origin': self.configuration,
+                        'configuration': self.current,
+                        'rule': self.rule,
+                        'moving weight': CONFIG['moving weight'],
+                        'iterations': self.generation,
+                        'cyclesize': 1}) if self.current else 0
+
+    def recall(self, fitness):
+        return self.__resolve__(self.currmin if fitness is None else fitness, measured=fitness is not None)
+
+    def halt(self):
+        return self.__resolve__(self.currmin, True)
+
+    def saved(self):
+        return self.times - 1 - self.generation
 
 
 def fitness(configuration, rule, times, currmin, limit):
-    confhistory, parthistory = [configuration], [split(configuration, 2)]
-    for i in range(1, times):
-        nextconf = advance(confhistory[-1], rule)
-        if len(nextconf) == 0:
-            return 0
-        if len(nextconf) > limit:
-            break
-        confhistory, parthistory = confhistory + \
-            [nextconf], parthistory + [split(nextconf, 2)]
-        cycle = cyclesize(parthistory)
-        if cycle:
-            return measure(CONFIG['metric'],
-                           {'origin': configuration,
-                            'configuration': nextconf,
-                            'rule': rule,
-                            'moving weight': CONFIG['moving weight'],
-                            'iterations': i,
-                            'cyclesize': cycle})
-    # logdata(configuration, rule, currmin, i)
-    return currmin
+    return Evaluation(configuration, rule, times, currmin, limit).run()
 
 
 def __add__(population, fitness, configuration, rule):
-    if fitness in population and (configuration, rule) in population[fitness]:
-        return population
-    if fitness not in population:
-        population[fitness] = []
-    population[fitness] += [(configuration, rule)]
+    population.add(fitness, configuration, rule)
     return population
 
 
 def seed(population, times):
     for _ in range(times):
-        rule = parse_rule(CONFIG['rule']) if 'rule' in CONFIG \
+        rule = parse_rule(CONFIG['rule']) if 'rule' in CONFIG and CONFIG['rule'] \
             else seed_rule(born=(1, 8), surv=(1, 8), range_b=(1, 3), range_s=(2, 4))
         configuration = seed_configuration(CONFIG['square size'],
                                            CONFIG['proportion'],
@@ -75,94 +177,205 @@ def seed(population, times):
     return population
 
 
-def sizepop(population): return len([*chain(*population.values())])
+def sizepop(population): return len(population)
+
+
+def avgfitness(population): return population.average()
+
+
+def minfitness(population): return population.min()
 
 
-def avgfitness(population):
-    return (sum(fit * len(poplist) for fit, poplist in population.items()) / sizepop(population)) if len(population) else 0.5
+def maxfitness(population): return population.max()
 
 
-def minfitness(population):
-    return min(sorted(population.keys())) if len(population) else 0.5
+def bestfit(population): return population.bestfit()
 
 
-def maxfitness(population):
-    return max(sorted(population.keys())) if len(population) else 0.5
+def naturalfit(population): return population.sample()
 
 
-def bestfit(population):
-    if len(population) == 0:
-        return 0, (set(), (frozenset(), frozenset()))
-    popitem = sorted(population.items())[-1]
-    return popitem[0], min(popitem[1], key=len)
+def __evaluate__(task):
+    childseed, pooled, evaluation, until = task
+    if pooled:
+        STATS.reset()
+    state = getstate()
+    randseed(childseed)
+    score = evaluation.score() if evaluation.run(until) is None else None
+    setstate(state)
+    return evaluation, score, STATS.snapshot() if pooled and STATS.enabled else None
 
 
-def naturalfit(population):
-    if len(population) == 0:
-        return 0, (set(), (frozenset(), frozenset()))
+def rungs(advances):
+    return [*sorted({advances // CONFIG['halving rate'] ** k for k in range(CONFIG['halving rungs'], 0, -1)
+                     if advances // CONFIG['halving rate'] ** k > 1}), advances]
 
-    def func(x): return (x[0] * len(x[1])) / \
-        (avgfitness(population)*sizepop(population))
-    popitem = choices([i for i in population.items()], weights=[
-                      *map(func, population.items())])[0]
-    return popitem[0], choice(popitem[1])
 
+def executor(workers=None):
+    workers = CONFIG['workers'] if workers is None else workers
+    workers = workers if workers >= 0 else max(0, cpu_count() + workers)
+    return ProcessPoolExecutor(max_workers=workers, initializer=configure, initargs=(dict(CONFIG),)) \
+        if workers else None
 
-def iterate(population, replacements, advances, sizelimit):
-    nextpop = dict()
+
+def iterate(population, replacements, advances, sizelimit, pool=None):
+    nextpop, offspring = Population(), []
+    st = STATS.clock()
     for _ in range(replacements):
         fitparent1, (parent1, rule1) = naturalfit(population)
-        nextpop = __add__(nextpop, fitparent1, parent1, rule1)
         fitparent2, (parent2, rule2) = naturalfit(population)
-        nextpop = __add__(nextpop, fitparent2, parent2, rule2)
         child, rulechild = mutate(
             crossover(parent1, parent2), CONFIG['mutations']), (rule1[0], rule2[1])
-        fitchild = fitness(child, rulechild, advances,
-                           minfitness(population), sizelimit)
+        offspring += [((fitparent1, parent1, rule1), (fitparent2, parent2, rule2), (child, rulechild))]
+    STATS.record('selection', st)
+    evaluations = [Evaluation(child, rulechild, advances, minfitness(population), sizelimit, BUDGET, WINDOW)
+                   for _, _, (child, rulechild) in offspring]
+    seeds = [getrandbits(64) for _ in evaluations]
+    keys = [CACHE.key(evaluation.configuration, evaluation.rule) for evaluation in evaluations] if CACHE else []
+    cached, culled = set(), set()
+    for j, key in enumerate(keys):
+        fitchild = CACHE.get(key)
+        if fitchild is not MISSING:
+            evaluations[j].recall(fitchild)
+            cached.add(j)
+    SAVINGS['lookups'] += len(keys)
+    SAVINGS['hits'] += len(cached)
+    STATS.count('fitness cache lookups', len(keys))
+    STATS.count('fitness cache hits', len(cached))
+    active = [j for j in range(len(evaluations)) if j not in cached]
+    st = STATS.clock()
+    for until in rungs(advances):
+        tasks = [(seeds[j], pool is not None, evaluations[j], until) for j in active]
+        results = pool.map(__evaluate__, tasks, chunksize=max(1, len(tasks) // (4 * cpu_count()))) \
+            if pool else map(__evaluate__, tasks)
+        unresolved = []
+        for j, (evaluation, score, snapshot) in zip(active, results):
+            if snapshot:
+                STATS.merge(snapshot)
+            evaluations[j] = evaluation
+            if evaluation.result is None:
+                unresolved += [(score, j)]
+        unresolved.sort(key=lambda x: -x[0])
+        active = [j for _, j in unresolved[:-(-len(unresolved) // CONFIG['halving rate'])]]
+        for _, j in unresolved[len(active):]:
+            evaluations[j].halt()
+            culled.add(j)
+        seeds = {j: getrandbits(64) for j in active}
+    STATS.record('evaluation', st)
+    for j, evaluation in enumerate(evaluations):
+        SAVINGS['generations'] += evaluation.generation
+        SAVINGS['saved'] += evaluation.saved() if evaluation.pruned else 0
+        SAVINGS['culled' if j in culled else 'pruned'] += evaluation.pruned
+        if CACHE and j not in cached and not evaluation.pruned:
+            CACHE.put(keys[j], evaluation.result if evaluation.measured else None)
+    st = STATS.clock()
+    for (_, _, (child, rulechild)), evaluation in zip(offspring, evaluations):
+        fitchild = evaluation.result
         if __name__ == '__main__':
             print('.', end='', flush=True)
         if fitchild == 0:
             continue
         nextpop = __add__(nextpop, fitchild, child, rulechild)
+    for parent1, parent2, _ in offspring:
+        nextpop = __add__(nextpop, *parent1)
+        nextpop = __add__(nextpop, *parent2)
+    STATS.record('merge', st)
     if __name__ == '__main__':
         print('')
     return nextpop
 
 
 def logdata(conf, rule, fit, iterations=None):
-    Thread(target=log, args=(__file__, LOGFILE, conf, rule, fit, iterations)).start()
+    st = STATS.clock()
+    LOGGER.write(LOGFILE, conf, rule, fit, iterations)
+    STATS.record('logging', st)
+
+
+def report(label, t, avgt, size, avg, maxfit):
+    print(label, ":\tt:", "{:.02f}".format(t),
+          "\tavg t:", "{:.02f}".format(avgt),
+          "\tpop:", "{:03d}".format(size),
+          "\tavg:", "{:.02f}".format(avg),
+          "\tmax:", "{:.02f}".format(maxfit))
 
 
-def run():
+def save(iteration, population, best, elapsed, writer=None):
+    if writer:
+        writer.join()
+    writer = Thread(target=checkpoint.save,
+                    args=(CHECKPOINT, iteration, checkpoint.snapshot(population), getstate(), best, elapsed))
+    writer.start()
+    return writer
+
+
+def __run__(resume, pool):
     currmax, currbest = 1, set()
-    pop = dict()
-    s = 0
-    for i in range(CONFIG['iterations']):
+    pop = Population()
+    s, start, writer = 0, 0, None
+    if resume and CHECKPOINT and exists(CHECKPOINT):
+        start, pop, state, (currmax, currbest), s = checkpoint.load(CHECKPOINT)
+        setstate(state)
+    for i in range(start, CONFIG['iterations']):
+        st = STATS.clock()
         pop = seed(pop, CONFIG['random inserts'])
-        st = process_time()
+        STATS.record('seeding', st)
+        st = perf_counter()
         pop = iterate(pop, CONFIG['replacements'],
-                      CONFIG['advances'], CONFIG['max size'])
-        t = (process_time() - st) / CONFIG['replacements']
+                      CONFIG['advances'], CONFIG['max size'], pool)
+        t = (perf_counter() - st) / CONFIG['replacements']
         s += t
         maxfit, (bestconf, bestrule) = bestfit(pop)
         if __name__ == '__main__':
-            print(i, ":\tt:", "{:.02f}".format(t),
-                  "\tavg t:", "{:.02f}".format(s/(i+1)),
-                  "\tpop:", "{:03d}".format(sizepop(pop)),
-                  "\tavg:", "{:.02f}".format(avgfitness(pop)),
-                  "\tmax:", "{:.02f}".format(maxfit))
+            report(i, t, s/(i+1), sizepop(pop), avgfitness(pop), maxfit)
+            if BUDGET or WINDOW or CONFIG['halving rungs']:
+                print("\t saved:", "{:.0%}".format(SAVINGS['saved'] / max(1, SAVINGS['saved'] + SAVINGS['generations'])),
+                      "of generations\tpruned:", SAVINGS['pruned'], "\tculled:", SAVINGS['culled'])
+            if CACHE:
+                print("\t fitness cache hits:", "{:.0%}".format(SAVINGS['hits'] / max(1, SAVINGS['lookups'])),
+                      "\toverall:", "{:.0%}".format(CACHE.hitrate()))
+        if CACHE:
+            CACHE.flush()
+        SAVINGS.clear()
         if currmax < maxfit or (currmax == maxfit and \
             len(bestconf) < len(currbest) or i % 50 == 49):
             currmax, currbest = maxfit, bestconf
             logdata(bestconf, bestrule, maxfit)
+        if STATS.enabled:
+            logger = {'logger ' + name: value for name, value in LOGGER.metrics().items()}
+            STATS.merge({'counters': logger, 'timers': dict(), 'histograms': dict()})
+            if __name__ == '__main__':
+                print("\t", STATS.breakdown())
+                print("\t", "\t".join("{}: {:.4g}".format(name, value) for name, value in logger.items()))
+            makedirs(join(dirname(__file__), "log"), exist_ok=True)
+            STATS.export(join(dirname(__file__), "log", CONFIG['stats']), i)
+            STATS.reset()
+        if CHECKPOINT and i % CONFIG['checkpoint interval'] == CONFIG['checkpoint interval'] - 1:
+            writer = save(i + 1, pop, (currmax, currbest), s, writer)
+    if writer:
+        writer.join()
+    LOGGER.close()
+    if CACHE:
+        CACHE.close()
+
+
+def run(resume=False):
+    pool = executor()
+    try:
+        __run__(resume, pool)
+    finally:
+        if pool:
+            pool.shutdown()
 
 
-def simulate(population):
+def simulate(population, pool=None):
     return iterate(seed(population, CONFIG['random inserts']),
                    CONFIG['replacements'],
                    CONFIG['advances'],
-                   CONFIG['max size'])
+                   CONFIG['max size'],
+                   pool)
 
 
 if __name__ == '__main__':
-    run()
+    parser = ArgumentParser(description="Evolve life configurations with a genetic algorithm")
+    parser.add_argument('--resume', action='store_true', help="continue from the last checkpoint")
+    run(parser.parse_args().resume)
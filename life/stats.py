@@ -0,0 +1,58 @@
+from collections import defaultdict
+from csv import writer
+from json import dumps
+from time import perf_counter
+
+
+class Stats:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.counters = defaultdict(int)
+        self.timers = defaultdict(float)
+        self.histograms = defaultdict(lambda: defaultdict(int))
+
+    def clock(self):
+        return perf_counter() if self.enabled else 0
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def record(self, name, start):
+        if self.enabled:
+            elapsed = perf_counter() - start
+            self.timers[name] += elapsed
+            self.histograms[name][max(0, int(elapsed * 1e6)).bit_length()] += 1
+
+    def snapshot(self):
+        return {'counters': dict(self.counters),
+                'timers': dict(self.timers),
+                'histograms': {name: dict(buckets) for name, buckets in self.histograms.items()}}
+
+    def merge(self, snapshot):
+        for name, n in snapshot['counters'].items():
+            self.counters[name] += n
+        for name, t in snapshot['timers'].items():
+            self.timers[name] += t
+        for name, buckets in snapshot['histograms'].items():
+            for bucket, n in buckets.items():
+                self.histograms[name][bucket] += n
+
+    def breakdown(self):
+        return "\t".join("{}: {:.02f}s".format(name, t) for name, t in sorted(self.timers.items()))
+
+    def export(self, filepath, iteration):
+        with open(filepath, "a") as file:
+            if filepath.endswith(".csv"):
+                rows = writer(file)
+                for kind, values in (('counter', self.counters), ('timer', self.timers)):
+                    for name, value in sorted(values.items()):
+                        rows.writerow([iteration, kind, name, value])
+            else:
+                file.write(dumps({'iteration': iteration, **self.snapshot()}) + "\n")
+
+
+STATS = Stats()
@@ -3,6 +3,7 @@ from random import gauss, random
 from snakes.composites import Snake, SnakeState
 from snakes.config import CONFIG
 from snakes.movement import ChaseRewardMovement, ChaseSnakeMovement
+from snakes.spatial import SpatialIndex
 
 
 def make_threshold(min_value, factor, value): 
@@ -36,7 +37,8 @@ class StarveBehavior(Behavior):
         return self.starvecounter < limit * size
 
     def post_movement(self, behaviors, obstacles, rewards):
-        hit_rwd = next((rwd for rwd in rewards if self.snake.head().intersect(rwd)), None)
+        hit_rwd = rewards.hit(self.snake.head()) if isinstance(rewards, SpatialIndex) else \
+            next((rwd for rwd in rewards if self.snake.head().intersect(rwd)), None)
         if hit_rwd is None:
             return True
         rewards.remove(hit_rwd)
@@ -48,7 +50,7 @@ class StarveBehavior(Behavior):
     def merge(self, snake):
         self.starvecounter = 0
         diff = self.snake.tail().center - snake.head().center
-        self.snake.parts += [part.displace(diff) for part in snake.parts[1:]]
+        self.snake.extend(snake, 1, diff)
         self.snake.vision_arc = gauss(mu=(self.snake.vision_arc + snake.vision_arc)*0.5,
                                       sigma=(self.snake.vision_arc + snake.vision_arc)*0.05)
         self.snake.vision_range = gauss(mu=(self.snake.vision_range + snake.vision_range)*0.5,
@@ -77,13 +79,18 @@ class SnakeBehavior(StarveBehavior):
     def post_movement(self, behaviors, obstacles, rewards):
         if self.snake.state != SnakeState.CHASING:
             return super().post_movement(behaviors, obstacles, rewards)
-        bit_behavior = next((be for be in behaviors 
-                                if be.snake.state != SnakeState.DEAD and 
-                                    self.snake.bite(be.snake)), None)
+        if self.snake.index is not None:
+            bitten = {owner for _, owner in self.snake.index.hits(self.snake.head())
+                      if owner.state != SnakeState.DEAD and self.snake.bite(owner)}
+            bit_behavior = next((be for be in behaviors if be.snake in bitten), None) if bitten else None
+        else:
+            bit_behavior = next((be for be in behaviors 
+                                    if be.snake.state != SnakeState.DEAD and 
+                                        self.snake.bite(be.snake)), None)
         if bit_behavior is None:
             return True
         bit_behavior.merge(self.snake)
-        self.snake.parts.clear()
+        self.snake.reshape([])
         return False
 
     def result(self):
@@ -96,7 +103,7 @@ class SnakeBehavior(StarveBehavior):
         children = [self.snake.parts[divpos(i):divpos(i+1)] for i in range(n_children)]
         if len(children[0]) < self.snake.size():
             self.snake.appendix = self.snake.parts[len(children[0])]
-        self.snake.parts = children[0]
+        self.snake.reshape(children[0])
         self.snake.state = SnakeState.ALIVE
         return self.__make_children__(children[1:])
 
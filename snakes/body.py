@@ -0,0 +1,29 @@
+from collections import deque
+from itertools import islice
+from common.geometry import Point
+
+
+class Body:
+    def __init__(self, parts=()):
+        self.circles = deque(parts)
+
+    def __len__(self): return len(self.circles)
+    def __iter__(self): return iter(self.circles)
+    def __add__(self, other): return list(self) + list(other)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self.circles))
+            return [*islice(self.circles, start, max(start, stop), step)] if step > 0 \
+                else [self.circles[i] for i in range(start, stop, step)]
+        return self.circles[index]
+
+    def advance(self, head):
+        self.circles.appendleft(head)
+        return self.circles.pop()
+
+    def append(self, circle):
+        self.circles.append(circle)
+
+    def extend(self, other, start=0, displacement=Point()):
+        self.circles.extend(circle.displace(displacement) for circle in islice(other, start, None))
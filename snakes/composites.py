@@ -1,7 +1,9 @@
 from enum import Enum, auto
 from math import degrees, radians
-from common.geometry import Circle, Direction
+from common.geometry import Circle, Direction, Point
+from snakes.body import Body
 from snakes.config import CONFIG
+from snakes.vision import visible_shapes
 
 class SnakeState(Enum):
     DEAD = auto(),
@@ -17,19 +19,27 @@ class Snake:
     def rand(area, size, radius):
         return Snake(size, Circle.rand(area.width(), area.height(), radius), Direction.rand())
 
-    def __init__(self, size=0, shape=None, direction=Direction.rand()):
+    def __init__(self, size=0, shape=None, direction=None):
         Snake.__instances__ += 1
         self.id = Snake.__instances__
         self.state = SnakeState.ALIVE
-        self.direction = direction
+        self.direction = direction = direction if direction else Direction.rand()
         self.vision_range = CONFIG['snake']['vision range']
         self.vision_arc = radians(CONFIG['snake']['vision arc'])
-        self.parts = []
+        self.segments = Body()
         self.appendix = None
+        self.index = None
         if size and shape:
-            self.parts += [shape]
+            parts = [shape]
             for _ in range(1, size):
-                self.parts += [self.parts[-1].move(direction.opposite())]
+                parts += [parts[-1].move(direction.opposite())]
+            self.segments = Body(parts)
+
+    @property
+    def parts(self): return self.segments
+
+    @parts.setter
+    def parts(self, parts): self.segments = parts if isinstance(parts, Body) else Body(parts)
 
     def __str__(self): 
         return type(self).__name__ \
@@ -38,10 +48,10 @@ class Snake:
             + "| " + "{:3d}".format(int(self.vision_range)) \
             + "| " + "{:3d}".format(int(degrees(self.vision_arc)))
 
-    def size(self): return len(self.parts)
-    def head(self): return self.parts[0]
-    def tail(self): return self.parts[-1]
-    def body(self): return self.parts[1:]
+    def size(self): return len(self.segments)
+    def head(self): return self.segments[0]
+    def tail(self): return self.segments[-1]
+    def body(self): return self.segments[1:]
 
     def distance_to(self, point):
         return self.head().center.distance(point)
@@ -49,22 +59,47 @@ class Snake:
     def direction_to(self, point):
         return self.head().center.direction(point)
 
+    def attach(self, index):
+        self.index = index
+        for part in self.parts:
+            index.insert(part, self)
+
+    def detach(self):
+        if self.index is not None:
+            for part in self.parts:
+                self.index.remove(part, self)
+        self.index = None
+
+    def extend(self, snake, start=0, displacement=Point()):
+        size = self.size()
+        self.segments.extend(snake.segments, start, displacement)
+        if self.index is not None:
+            for part in self.segments[size:]:
+                self.index.insert(part, self)
+
+    def reshape(self, parts):
+        index = self.index
+        self.detach()
+        self.parts = parts
+        if index is not None: self.attach(index)
+
     def move(self, direction=None):
         if direction: self.direction = direction
-        self.appendix = self.tail()
-        self.parts = [self.head().move(self.direction)] + self.parts[:-1]
+        self.appendix = self.segments.advance(self.head().move(self.direction))
+        if self.index is not None:
+            self.index.remove(self.appendix, self)
+            self.index.insert(self.head(), self)
     
     def grow(self):
-        if self.appendix: self.parts += [self.appendix]
+        if self.appendix: self.segments.append(self.appendix)
+        if self.appendix and self.index is not None: self.index.insert(self.appendix, self)
         self.appendix = None
 
     def intersect(self, shape):
         return next((part for part in self.parts if shape.intersect(part)), None) is not None
 
     def visible_shapes(self, shapes):
-        return [shape for shape in shapes 
-                if self.distance_to(shape.center) < self.vision_range and \
-                    self.direction.contains(self.head().center.angle(shape.center), self.vision_arc)]
+        return visible_shapes(self, shapes)
 
     def bite(self, snake): 
         return self.head().intersect(snake.tail())
@@ -0,0 +1,110 @@
+from argparse import ArgumentParser
+from common.geometry import Point, Rectangle
+from random import seed as randseed
+from snakes.behavior import SnakeBehavior
+from snakes.composites import SnakeState, create_reward, create_snake
+from snakes.config import CONFIG
+from snakes.scheduler import Scheduler
+from snakes.spatial import SpatialIndex
+from time import perf_counter, sleep
+
+
+class World:
+    def __init__(self, area, population=CONFIG['initial snakes'], seed=None):
+        self.area = area
+        self.population = population
+        self.space = SpatialIndex(CONFIG['grid cell'])
+        self.rewards = SpatialIndex(CONFIG['grid cell'])
+        self.snakes = []
+        self.behaviors = []
+        self.scheduler = Scheduler(seed)
+        self.dead = dict()
+        self.time = 0
+
+    def __act__(self, behavior, time):
+        for child in behavior.act(self.behaviors, [self.space], self.rewards):
+            self.start_snake(child, time)
+        if behavior.snake.state != SnakeState.DEAD:
+            self.scheduler.schedule(behavior, time + 1 / behavior.movement.speed)
+
+    def start_snake(self, snake=None, time=None):
+        snake = snake if snake else create_snake(self.area, obstacles=[self.space])
+        snake.attach(self.space)
+        self.snakes += [snake]
+        self.behaviors += [SnakeBehavior(snake, self.area)]
+        self.__act__(self.behaviors[-1], self.time if time is None else time)
+
+    def populate(self):
+        for _ in range(self.population):
+            self.start_snake()
+
+    def __static__(self):
+        n_rewards = int(self.population * CONFIG['reward per snake'])
+        for _ in range(len(self.rewards), n_rewards):
+            self.rewards.insert(create_reward(self.area, obstacles=[self.rewards, self.space]))
+        new_dead = {snake for snake in self.snakes if snake.state == SnakeState.DEAD and snake not in self.dead}
+        for snake in new_dead:
+            self.dead[snake] = self.time + CONFIG['removal delay'] * CONFIG['fps']
+        for behavior in self.behaviors:
+            if behavior.snake in new_dead:
+                self.scheduler.cancel(behavior)
+        self.behaviors = [behavior for behavior in self.behaviors if behavior.snake not in new_dead]
+        purged = {snake for snake, due in self.dead.items() if due <= self.time}
+        for snake in purged:
+            snake.detach()
+            del self.dead[snake]
+        self.snakes = [snake for snake in self.snakes if snake not in purged]
+        return purged
+
+    def frame(self):
+        while True:
+            time, batch = self.scheduler.pop(self.time + 1)
+            if not batch:
+                break
+            for behavior in batch:
+                self.__act__(behavior, time)
+        self.time += 1
+        return self.__static__()
+
+    def active(self):
+        return len(self.behaviors) != 0
+
+    def stats(self):
+        alive = [behavior.snake for behavior in self.behaviors]
+        def mean(values): return sum(values) / len(values) if values else 0
+        return {'frame': self.time, 'snakes': len(alive),
+                'size': mean([snake.size() for snake in alive]),
+                'vision range': mean([snake.vision_range for snake in alive]),
+                'vision arc': mean([snake.vision_arc for snake in alive]),
+                'rewards': len(self.rewards)}
+
+
+def run(frames, width, height, population=CONFIG['initial snakes'], interval=None, seed=None, realtime=False):
+    world = World(Rectangle(Point(), Point(width, height)), population, seed)
+    world.populate()
+    start = perf_counter()
+    for frame in range(frames):
+        world.frame()
+        if realtime:
+            sleep(max(0, start + (frame + 1) / CONFIG['fps'] - perf_counter()))
+        if interval and frame % interval == interval - 1 and __name__ == '__main__':
+            print("\t".join("{}: {}".format(k, round(v, 2)) for k, v in world.stats().items()))
+        if not world.active():
+            break
+    return world
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Run the snakes ecosystem headless at full speed")
+    parser.add_argument('--frames', type=int, default=CONFIG['headless']['frames'])
+    parser.add_argument('--width', type=int, default=CONFIG['headless']['width'])
+    parser.add_argument('--height', type=int, default=CONFIG['headless']['height'])
+    parser.add_argument('--snakes', type=int, default=CONFIG['initial snakes'])
+    parser.add_argument('--interval', type=int, default=CONFIG['headless']['report interval'],
+                        help="frames between stats lines")
+    parser.add_argument('--seed', type=int, help="seed the random generator for a reproducible run")
+    parser.add_argument('--realtime', action='store_true', help="pace frames at the configured fps")
+    args = parser.parse_args()
+    if args.seed is not None:
+        randseed(args.seed)
+    run(args.frames, args.width, args.height, args.snakes, args.interval, args.seed, args.realtime)
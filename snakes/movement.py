@@ -2,6 +2,7 @@ from itertools import cycle
 from common.geometry import Direction, Point
 from snakes.composites import Snake, SnakeState
 from snakes.config import CONFIG
+from snakes.spatial import SpatialIndex
 
 
 class Movement:
@@ -36,9 +37,13 @@ class RandomMovement(Movement):
 
 class ChaseRewardMovement(RandomMovement):
     def __choose_direction__(self, obstacles, rewards):
-        def direct(rwd): return self.snake.direction_to(rwd.center)
-        eligible_destination = min([(rwd.center, direct(rwd)) for rwd in self.snake.visible_shapes(rewards)
-                                    if self.__check_direction__(direct(rwd), obstacles)],
+        checked = dict()
+        def check(direction):
+            if direction not in checked:
+                checked[direction] = self.__check_direction__(direction, obstacles)
+            return checked[direction]
+        directions = ((rwd.center, self.snake.direction_to(rwd.center)) for rwd in self.snake.visible_shapes(rewards))
+        eligible_destination = min([(center, direction) for center, direction in directions if check(direction)],
                                    key=lambda x: self.snake.distance_to(x[0]),
                                    default=self.__fake_target__(obstacles, rewards))
         self.destination = eligible_destination[0]
@@ -60,12 +65,20 @@ class ChaseRewardMovement(RandomMovement):
 
 class ChaseSnakeMovement(ChaseRewardMovement):
     def __choose_direction__(self, obstacles, rewards):
-        modified_obstacles = rewards.copy()
+        modified_obstacles = [rewards] if isinstance(rewards, SpatialIndex) else rewards.copy()
         modified_rewards = []
         for obs in obstacles:
-            if(isinstance(obs, Snake) and obs != self.snake and obs.state != SnakeState.DEAD):
+            if isinstance(obs, SpatialIndex):
+                modified_rewards += [owner.tail() for part, owner in obs.near(self.snake.head().center,
+                                                                              self.snake.vision_range)
+                                     if self.__prey__(owner) and part == owner.tail()]
+                modified_obstacles += [obs.excluding(lambda part, owner: self.__prey__(owner) and part == owner.tail())]
+            elif(isinstance(obs, Snake) and obs != self.snake and obs.state != SnakeState.DEAD):
                 modified_rewards += [obs.tail()]
                 modified_obstacles += obs.parts[:-1]
             else:
                 modified_obstacles += [obs]
         return super().__choose_direction__(modified_obstacles, modified_rewards)
+
+    def __prey__(self, snake):
+        return snake != self.snake and snake.state != SnakeState.DEAD
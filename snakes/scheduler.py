@@ -0,0 +1,37 @@
+from heapq import heappop, heappush
+from itertools import count
+from random import Random
+
+
+class Scheduler:
+    def __init__(self, seed=None):
+        self.queue = []
+        self.pending = dict()
+        self.sequence = count()
+        self.random = Random(seed) if seed is not None else None
+
+    def schedule(self, item, time):
+        entry = time, next(self.sequence), item
+        self.pending[item] = entry
+        heappush(self.queue, entry)
+
+    def cancel(self, item):
+        self.pending.pop(item, None)
+
+    def __discard__(self):
+        while self.queue and self.pending.get(self.queue[0][2]) is not self.queue[0]:
+            heappop(self.queue)
+
+    def pop(self, until):
+        self.__discard__()
+        if not self.queue or self.queue[0][0] >= until:
+            return None, []
+        time, batch = self.queue[0][0], []
+        while self.queue and self.queue[0][0] == time:
+            entry = heappop(self.queue)
+            if self.pending.get(entry[2]) is entry:
+                del self.pending[entry[2]]
+                batch.append(entry[2])
+        if self.random:
+            self.random.shuffle(batch)
+        return time, batch
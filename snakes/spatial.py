@@ -0,0 +1,86 @@
+from collections import Counter
+from math import floor
+
+
+class SpatialIndex:
+    def __init__(self, cellsize):
+        self.cellsize = cellsize
+        self.cells = dict()
+        self.entries = dict()
+        self.size = 0
+
+    def __len__(self): return self.size
+    def __contains__(self, circle): return circle in self.entries
+
+    def __iter__(self):
+        return (circle for circle, owners in list(self.entries.items()) for _ in range(sum(owners.values())))
+
+    def __span__(self, center, reach):
+        return range(floor((center.x - reach) / self.cellsize), floor((center.x + reach) / self.cellsize) + 1), \
+            range(floor((center.y - reach) / self.cellsize), floor((center.y + reach) / self.cellsize) + 1)
+
+    def __keys__(self, center, reach):
+        xs, ys = self.__span__(center, reach)
+        return [(x, y) for x in xs for y in ys]
+
+    def __occupied__(self, center, reach):
+        xs, ys = self.__span__(center, reach)
+        if len(xs) * len(ys) <= len(self.cells):
+            return (self.cells[(x, y)] for x in xs for y in ys if (x, y) in self.cells)
+        return (circles for (x, y), circles in self.cells.items() if x in xs and y in ys)
+
+    def insert(self, circle, owner=None):
+        if circle not in self.entries:
+            self.entries[circle] = Counter()
+            for cell in self.__keys__(circle.center, circle.radius):
+                self.cells.setdefault(cell, set()).add(circle)
+        self.entries[circle][owner] += 1
+        self.size += 1
+
+    def remove(self, circle, owner=None):
+        owners = self.entries[circle]
+        owners[owner] -= 1
+        self.size -= 1
+        if owners[owner] == 0:
+            del owners[owner]
+        if owners:
+            return
+        del self.entries[circle]
+        for cell in self.__keys__(circle.center, circle.radius):
+            self.cells[cell].discard(circle)
+            if not self.cells[cell]:
+                del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self.size = 0
+
+    def near(self, center, distance):
+        seen = set()
+        for circles in self.__occupied__(center, distance):
+            for circle in circles:
+                if circle not in seen:
+                    seen.add(circle)
+                    yield from ((circle, owner) for owner in self.entries[circle])
+
+    def hits(self, shape, ignore=None):
+        return ((circle, owner) for circle, owner in self.near(shape.center, shape.radius)
+                if shape.intersect(circle) and not (ignore and ignore(circle, owner)))
+
+    def hit(self, shape, ignore=None):
+        return next((circle for circle, _ in self.hits(shape, ignore)), None)
+
+    def intersect(self, shape):
+        return self.hit(shape) is not None
+
+    def excluding(self, ignore):
+        return Excluding(self, ignore)
+
+
+class Excluding:
+    def __init__(self, index, ignore):
+        self.index, self.ignore = index, ignore
+
+    def intersect(self, shape):
+        return self.index.hit(shape, self.ignore) is not None
@@ -0,0 +1,21 @@
+from math import atan2, hypot, pi
+from snakes.spatial import SpatialIndex
+
+
+def __candidates__(snake, shapes):
+    if isinstance(shapes, SpatialIndex):
+        return (circle for circle, _ in shapes.near(snake.head().center, snake.vision_range))
+    return shapes
+
+
+def __sees__(snake, head, direction, circle):
+    dx, dy = circle.center.x - head.x, circle.center.y - head.y
+    angle = atan2(dy, dx) % (2 * pi)
+    lower = (direction - snake.vision_arc / 2) % (2 * pi)
+    angle += (2 * pi) * (angle < lower)
+    return hypot(dx, dy) < snake.vision_range and lower <= angle <= lower + snake.vision_arc
+
+
+def visible_shapes(snake, shapes):
+    head, direction = snake.head().center, snake.direction.to_radians()
+    return [circle for circle in __candidates__(snake, shapes) if __sees__(snake, head, direction, circle)]